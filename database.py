@@ -1,26 +1,43 @@
+from __future__ import annotations
+
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 import json
 import logging
-import random
-import tkinter as tk
 import urllib.request
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 import httpx
-import openai
-import requests
-from botbuilder.core import MessageFactory, TurnContext
-from botbuilder.schema import Activity, ActivityTypes, EndOfConversationCodes
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_random_exponential
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from googletrans import Translator
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
 from termcolor import colored  # Ensure termcolor is installed
 
-from module.utils import connect_to_database
+from module.batch import batch_max_concurrency, expand_questions, run_calls
+from module.lazy import lazy_import, measure_import_costs, print_import_report
+from module.utils import ask_database, get_vader_analyzer, get_connection_pool
+from module.chat import azure_chat_completion_stream, azure_chat_completion_request_async, get_http_client, is_retryable_error
+from module.gateway import get_gateway
+from module.memory import ConversationStore
+from module.reasoning import (DAVINCI_PERSPECTIVE, FALLACY_PERSPECTIVE, INTUITION_PERSPECTIVE, KINDNESS_PERSPECTIVE,
+                              NEURAL_PERSPECTIVE, QUANTUM_PERSPECTIVE, Perspective, ReasoningEngine)
+from module.registry import FunctionRegistry
+from module.semantic_cache import get_semantic_cache
+from module.translation import get_translation_memory
+from module.prompt import PromptBuilder
+from module.streaming import TurnStreamer, stream_responses_enabled
+
+if TYPE_CHECKING:
+    from botbuilder.core import TurnContext
+    from textblob import TextBlob
+
+# Integrations are imported on first use to keep worker start-up fast; see report_import_costs()
+tk = lazy_import("tkinter", "consent_ui")
+botbuilder_core = lazy_import("botbuilder.core", "bot_framework")
+botbuilder_schema = lazy_import("botbuilder.schema", "bot_framework")
+textblob = lazy_import("textblob", "textblob")
 
 def show_privacy_consent():
     """Display a pop-up window to obtain user consent for data collection and privacy."""
@@ -76,8 +93,8 @@ if not news_api_key:
 if not alpha_vantage_api_key:
     logging.error("Alpha Vantage API key not found in environment variables.")
 
-# Set your OpenAI API key
-openai.api_key = openai_api_key
+# Set your OpenAI API key when the openai integration is first used
+openai = lazy_import("openai", "openai", on_load=lambda module: setattr(module, "api_key", openai_api_key))
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -91,117 +108,143 @@ def download_database(url: str, file_path: str) -> None:
     except urllib.error.URLError as e:
         logging.error(f"Error: Failed to download database. {e}")
 
-# Database connection
+# Database, downloaded on first use; pibrain.main() bootstraps it at start-up
 db_path = "data/Chinook.db"
 db_url = "https://github.com/lerocha/chinook-database/raw/master/ChinookDatabase/DataSources/Chinook_Sqlite.sqlite"
-if not os.path.exists(db_path):
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    download_database(db_url, db_path)
-conn = connect_to_database(db_path)
-if not conn:
-    logging.error(colored(f"Error: Database file '{db_path}' not found.", "red"))
+
+def ensure_database() -> bool:
+    """Download the database if it is missing; return whether it is available."""
+    if not os.path.exists(db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        download_database(db_url, db_path)
+    return os.path.exists(db_path)
+
+def query_database(query: str) -> list:
+    """Run a read-only query on a pooled connection so concurrent bot turns never share one handle."""
+    if not ensure_database():
+        raise FileNotFoundError(f"Database '{db_path}' is not available")
+    with get_connection_pool(db_path).connection() as pooled_conn:
+        return ask_database(pooled_conn, query)
 
 # Sentiment analysis functions
 def analyze_sentiment_textblob(text: str) -> TextBlob:
     """Analyze the sentiment of the given text using TextBlob."""
-    blob = TextBlob(text)
+    blob = textblob.TextBlob(text)
     sentiment = blob.sentiment
     return sentiment
 
 def analyze_sentiment_vader(text: str) -> dict:
     """Analyze the sentiment of the given text using VADER."""
-    analyzer = SentimentIntensityAnalyzer()
+    analyzer = get_vader_analyzer()
     sentiment = analyzer.polarity_scores(text)
     return sentiment
 
 async def end_conversation(turn_context: TurnContext) -> None:
     """Ends the conversation with the user."""
     await turn_context.send_activity(
-        MessageFactory.text("Ending conversation from the skill...")
+        botbuilder_core.MessageFactory.text("Ending conversation from the skill...")
     )
-    end_of_conversation = Activity(type=ActivityTypes.end_of_conversation)
-    end_of_conversation.code = EndOfConversationCodes.completed_successfully
+    end_of_conversation = botbuilder_schema.Activity(type=botbuilder_schema.ActivityTypes.end_of_conversation)
+    end_of_conversation.code = botbuilder_schema.EndOfConversationCodes.completed_successfully
     await turn_context.send_activity(end_of_conversation)
 
 async def handle_error(turn_context: TurnContext, error: Exception) -> None:
     """Handles errors by logging them and notifying the user."""
     logging.error(f"An error occurred: {error}")
     await turn_context.send_activity(
-        MessageFactory.text("An error occurred. Please try again later.")
+        botbuilder_core.MessageFactory.text("An error occurred. Please try again later.")
     )
 
 class MyBot:
     def __init__(self):
-        self.context = {}
+        self.prompt_builder = PromptBuilder()
+        self.context = ConversationStore(on_evict=self.prompt_builder.forget)
 
     async def enhance_context_awareness(self, user_id: str, text: str) -> None:
         """Enhance context awareness by analyzing the user's environment, activities, and emotional state."""
         sentiment = analyze_sentiment_vader(text)
-        if user_id not in self.context:
-            self.context[user_id] = []
-        self.context[user_id].append({"text": text, "sentiment": sentiment})
+        self.context.append(user_id, {"text": text, "sentiment": sentiment})
 
     async def proactive_learning(self, user_id: str, feedback: str) -> None:
         """Encourage proactive learning by seeking feedback and exploring new topics."""
-        if user_id not in self.context:
-            self.context[user_id] = []
-        self.context[user_id].append({"feedback": feedback})
+        self.context.append(user_id, {"feedback": feedback})
 
     async def ethical_decision_making(self, user_id: str, decision: str) -> None:
         """Integrate ethical principles into decision-making processes."""
         ethical_decision = f"Considering ethical principles, the decision is: {decision}"
-        if user_id not in self.context:
-            self.context[user_id] = []
-        self.context[user_id].append({"ethical_decision": ethical_decision})
+        self.context.append(user_id, {"ethical_decision": ethical_decision})
 
     async def emotional_intelligence(self, user_id: str, text: str) -> str:
         """Develop emotional intelligence by recognizing and responding to user emotions."""
         sentiment = analyze_sentiment_vader(text)
         response = f"I sense that you are feeling {sentiment['compound']}. How can I assist you further?"
-        if user_id not in self.context:
-            self.context[user_id] = []
-        self.context[user_id].append({"emotional_response": response})
+        self.context.append(user_id, {"emotional_response": response})
         return response
 
     async def transparency_and_explainability(self, user_id: str, decision: str) -> str:
         """Enable transparency by explaining the reasoning behind decisions."""
         explanation = f"The decision was made based on the following context: {self.context[user_id]}"
-        if user_id not in self.context:
-            self.context[user_id] = []
-        self.context[user_id].append({"explanation": explanation})
+        self.context.append(user_id, {"explanation": explanation})
         return explanation
 
     async def on_message_activity(self, turn_context: TurnContext) -> None:
         """Handles incoming messages and generates responses."""
         user_id = turn_context.activity.from_property.id
-        if user_id not in self.context:
-            self.context[user_id] = []
         try:
             if "end" in turn_context.activity.text or "stop" in turn_context.activity.text:
                 await end_conversation(turn_context)
                 self.context.pop(user_id, None)
+                self.prompt_builder.forget(user_id)
             else:
-                self.context[user_id].append(turn_context.activity.text)
-                response = await self.generate_response(turn_context.activity.text, user_id)
-                await turn_context.send_activity(MessageFactory.text(response))
+                self.context.append(user_id, turn_context.activity.text)
+                if stream_responses_enabled:
+                    await self.stream_response(turn_context, turn_context.activity.text, user_id)
+                else:
+                    response = await self.generate_response(turn_context.activity.text, user_id)
+                    await turn_context.send_activity(botbuilder_core.MessageFactory.text(response))
         except Exception as e:
             await handle_error(turn_context, e)
 
     async def generate_response(self, text: str, user_id: str) -> str:
-        """Generates a response using OpenAI's API."""
+        """Generates a response using Azure OpenAI without blocking the event loop."""
         try:
             logging.info(f"Generating response for user_id: {user_id} with text: {text}")
-            response = openai.Completion.create(
-                engine="text-davinci-003",
-                prompt=f"User: {text}\nContext: {self.context[user_id]}\nBot:",
-                max_tokens=150
-            )
-            logging.info(f"OpenAI response: {response}")
-            return response.choices[0].text.strip()
-        except openai.error.OpenAIError as e:
+            prompt = self.build_prompt(user_id, text)
+            response = await chat_completion_request_async(prompt["messages"])
+            logging.info(f"Azure OpenAI response: {response}")
+            return response
+        except httpx.HTTPError as e:
+            # Never show the service's error text to the user
             logging.error(f"Error generating response: {e}")
             return "Sorry, I couldn't generate a response at this time."
 
+    async def stream_response(self, turn_context: TurnContext, text: str, user_id: str) -> str:
+        """Send the reply to the turn as it is generated; latencies go to module.streaming.streaming_metrics.
+
+        Falls back to generate_response() when the stream fails before any text reached the user.
+        """
+        prompt = self.build_prompt(user_id, text)
+        streamer = TurnStreamer(turn_context)
+        try:
+            response = await streamer.stream(chat_completion_stream(prompt["messages"]))
+            logging.info(f"Streamed response for user_id {user_id} in {streamer.sent} message(s), "
+                         f"first token after {streamer.first_token_latency or 0:.3f}s")
+            return response
+        except (httpx.HTTPError, ValueError) as e:
+            logging.error(f"Error streaming response: {e}")
+            if streamer.sent:
+                return streamer.text
+        response = await self.generate_response(text, user_id)
+        await turn_context.send_activity(botbuilder_core.MessageFactory.text(response))
+        return response
+
+    def build_prompt(self, user_id: str, text: str) -> dict:
+        """Assemble the token-budgeted prompt for the user's next turn."""
+        prompt = self.prompt_builder.build(user_id, text, self.context[user_id])
+        logging.info(f"Prompt tokens for user_id {user_id}: {prompt['prompt_tokens']} "
+                     f"({prompt['context_entries']} context entries)")
+        return prompt
+
 # Example usage of MyBot class
 bot = MyBot()
 
@@ -232,127 +275,141 @@ def davinci_insights(question: str) -> str:
 
 def think_like_davinci(question: str) -> str:
     """Generate insights like Da Vinci for the given question."""
-    perspectives = [
-        f"What if we view '{question}' from the perspective of the stars?",
-        f"Consider '{question}' as if it's a masterpiece of the universe.",
-        f"Reflect on '{question}' through the lens of nature's design."
-    ]
-    return random.choice(perspectives)
+    return DAVINCI_PERSPECTIVE(question)
 
 def human_intuition(question: str) -> str:
     """Provide human intuition for the given question."""
-    intuition = [
-        "How does this question make you feel?",
-        "What emotional connection do you have with this topic?",
-        "What does your gut instinct tell you about this?"
-    ]
-    return random.choice(intuition)
+    return INTUITION_PERSPECTIVE(question)
 
 def neural_network_thinking(question: str) -> str:
     """Apply neural network thinking to the given question."""
-    neural_perspectives = [
-        f"Process '{question}' through a multi-layered neural network.",
-        f"Apply deep learning to uncover hidden insights about '{question}'.",
-        f"Use machine learning to predict patterns in '{question}'."
-    ]
-    return random.choice(neural_perspectives)
+    return NEURAL_PERSPECTIVE(question)
 
 def quantum_computing_thinking(question: str) -> str:
     """Apply quantum computing principles to the given question."""
-    quantum_perspectives = [
-        f"Consider '{question}' using quantum superposition principles.",
-        f"Apply quantum entanglement to find connections in '{question}'.",
-        f"Utilize quantum computing to solve '{question}' more efficiently."
-    ]
-    return random.choice(quantum_perspectives)
+    return QUANTUM_PERSPECTIVE(question)
 
 def resilient_kindness(question: str) -> str:
     """Provide perspectives of resilient kindness."""
-    kindness_perspectives = [
-        "Despite losing everything, seeing life as a chance to grow.",
-        "Finding strength in kindness after facing life's hardest trials.",
-        "Embracing every challenge as an opportunity for growth and compassion."
-    ]
-    return random.choice(kindness_perspectives)
+    return KINDNESS_PERSPECTIVE(question)
 
 def identify_and_refute_fallacies(argument: str) -> str:
     """Identify and refute common logical fallacies in the argument."""
-    fallacies = [
-        "Ad Hominem",
-        "Straw Man",
-        "False Dilemma",
-        "Slippery Slope",
-        "Circular Reasoning",
-        "Hasty Generalization",
-        "Red Herring",
-        "Post Hoc Ergo Propter Hoc",
-        "Appeal to Authority",
-        "Bandwagon Fallacy",
-        "False Equivalence"
-    ]
-    refutations = [
-        "This is an ad hominem fallacy. Let's focus on the argument itself rather than attacking the person.",
-        "This is a straw man fallacy. The argument is being misrepresented.",
-        "This is a false dilemma fallacy. There are more options than presented.",
-        "This is a slippery slope fallacy. The conclusion does not necessarily follow from the premise.",
-        "This is circular reasoning. The argument's conclusion is used as a premise.",
-        "This is a hasty generalization. The conclusion is based on insufficient evidence.",
-        "This is a red herring fallacy. The argument is being diverted to an irrelevant topic.",
-        "This is a post hoc ergo propter hoc fallacy. Correlation does not imply causation.",
-        "This is an appeal to authority fallacy. The argument relies on the opinion of an authority figure.",
-        "This is a bandwagon fallacy. The argument assumes something is true because many people believe it.",
-        "This is a false equivalence fallacy. The argument equates two things that are not equivalent."
-    ]
-    return random.choice(refutations)
+    return FALLACY_PERSPECTIVE(argument)
+
+# Perspectives combined by universal_reasoning, in answer order
+reasoning_engine = ReasoningEngine([
+    Perspective("newton_thoughts", function=newton_thoughts, deterministic=True),
+    DAVINCI_PERSPECTIVE,
+    INTUITION_PERSPECTIVE,
+    NEURAL_PERSPECTIVE,
+    QUANTUM_PERSPECTIVE,
+    KINDNESS_PERSPECTIVE,
+    FALLACY_PERSPECTIVE,
+])
+
 
 def universal_reasoning(question: str) -> str:
-    """Generate a comprehensive response using various reasoning methods."""
-    responses = [
-        newton_thoughts(question),
-        davinci_insights(question),
-        human_intuition(question),
-        neural_network_thinking(question),
-        quantum_computing_thinking(question),
-        resilient_kindness(question),
-        identify_and_refute_fallacies(question)
-    ]
-    return "\n".join(responses)
+    """Generate a comprehensive response using various reasoning methods.
+
+    With PI_REASONING_SEED set, answers are deterministic per question and cached;
+    see module/reasoning.py.
+    """
+    return reasoning_engine.reason(question)
+
+
+async def universal_reasoning_async(question: str, latency_budget: float | None = None) -> dict:
+    """Run the perspectives concurrently from bot code and return whichever finished within the latency budget.
+
+    Register extra perspectives with reasoning_engine.register(); async ones, or sync ones
+    marked blocking (e.g. LLM or database lookups), run concurrently under their own timeouts.
+    """
+    return await reasoning_engine.reason_async(question, latency_budget)
 
-def stream_thread_responses(thread_id: str, assistant_id: str) -> None:
-    """Stream thread responses from OpenAI."""
+def stream_thread_responses(thread_id: str, assistant_id: str, on_delta=print) -> str:
+    """Stream thread responses from OpenAI, passing each text delta to on_delta, and return the full text."""
     client = openai.OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
     with client.beta.threads.runs.stream(thread_id=thread_id, assistant_id=assistant_id, instructions='Please address the user as Jane Doe. The user has a premium account.') as stream:
+        parts = []
         for event in stream:
             if event.type == 'thread.message.delta' and event.data.delta.content:
-                print(event.data.delta.content[0].text)
+                text = event.data.delta.content[0].text
+                delta = getattr(text, "value", text)
+                parts.append(str(delta))
+                on_delta(delta)
+    return "".join(parts)
+
+# Only transport errors, throttling and server errors are retried; the last error is re-raised as is
+@retry(wait=wait_random_exponential(min=1, max=40), stop=stop_after_attempt(3),
+       retry=retry_if_exception(is_retryable_error), reraise=True)
+def post_chat_completion(messages: list, model: str = "gpt-4") -> str:
+    """Send a chat completion request to Azure OpenAI and return the reply, raising httpx.HTTPStatusError on failure."""
+    headers = {
+        "Content-Type": "application/json",
+        "api-key": azure_openai_api_key
+    }
+    payload = {
+        "model": model,
+        "messages": messages
+    }
+    response = get_http_client().post(azure_openai_endpoint, headers=headers, json=payload)
+    response.raise_for_status()
+    return response.json()["choices"][0]["message"]["content"].strip()
 
-@retry(wait=wait_random_exponential(min=1, max=40), stop=stop_after_attempt(3))
 def chat_completion_request(messages: list, model: str = "gpt-4") -> str:
     """Make a chat completion request to Azure OpenAI."""
     try:
-        headers = {
-            "Content-Type": "application/json",
-            "api-key": azure_openai_api_key
-        }
-        payload = {
-            "model": model,
-            "messages": messages
-        }
-        response = httpx.post(azure_openai_endpoint, headers=headers, json=payload)
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"].strip()
+        return post_chat_completion(messages, model)
     except httpx.HTTPStatusError as e:
         logging.error("Unable to generate ChatCompletion response")
         logging.error(f"Exception: {e}")
         return str(e)
 
-def get_internet_answer(question: str) -> str:
-    """Get an answer from the internet using chat completion request."""
+@retry(wait=wait_random_exponential(min=1, max=40), stop=stop_after_attempt(3),
+       retry=retry_if_exception(is_retryable_error), reraise=True)
+async def chat_completion_request_async(messages: list, model: str = "gpt-4") -> str:
+    """Awaitable chat completion request to Azure OpenAI over the shared pooled client."""
+    return await azure_chat_completion_request_async(
+        messages,
+        model=model,
+        endpoint=azure_openai_endpoint,
+        api_key=azure_openai_api_key
+    )
+
+
+async def chat_completion_stream(messages: list, model: str = "gpt-4"):
+    """Async iterator over the text deltas of a streamed Azure OpenAI chat completion."""
+    async for delta in azure_chat_completion_stream(
+        messages,
+        model=model,
+        endpoint=azure_openai_endpoint,
+        api_key=azure_openai_api_key
+    ):
+        yield delta
+
+def get_internet_answer(question: str, system_prompt: str = "You are a helpful assistant.") -> str:
+    """Get an answer from the internet using chat completion request.
+
+    Answers are kept in the semantic cache, keyed by system prompt, so a question
+    close enough to one answered recently is served without calling the model.
+    Error responses are never cached.
+    """
+    cache = get_semantic_cache()
+    answer = cache.lookup(question, system_prompt)
+    if answer is not None:
+        return answer
     messages = [
-        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "system", "content": system_prompt},
         {"role": "user", "content": question}
     ]
-    return chat_completion_request(messages)
+    try:
+        answer = post_chat_completion(messages)
+    except httpx.HTTPStatusError as e:
+        logging.error("Unable to generate ChatCompletion response")
+        logging.error(f"Exception: {e}")
+        return str(e)
+    cache.store(question, system_prompt, answer)
+    return answer
 
 def reflect_on_decisions() -> str:
     """Regularly reflect on your decisions, the processes you used, the information you considered, and the perspectives you may have missed."""
@@ -362,79 +419,74 @@ def reflect_on_decisions() -> str:
     )
     return reflection_message
 
-def process_questions_from_json(file_path: str):
-    """Process questions from a JSON file and call the appropriate functions."""
+# Schema files describing the functions that questions files may call
+FUNCTION_SCHEMA_FILES = ("questions2.json", "questions3.json", "index_schema.json")
+function_registry = None
+
+
+def get_function_registry() -> FunctionRegistry:
+    """Build the registry of callable functions from FUNCTION_SCHEMA_FILES once and return it."""
+    global function_registry
+    if function_registry is None:
+        base_dir = Path(__file__).resolve().parent
+        function_registry = FunctionRegistry.from_schema_files([base_dir / name for name in FUNCTION_SCHEMA_FILES],
+                                                               globals())
+    return function_registry
+
+
+def process_questions_from_json(file_path: str, output=None, max_concurrency: int = batch_max_concurrency) -> list:
+    """Run every function listed in a questions JSON file concurrently and return per-call records.
+
+    Records come back in file order with status, response or error, and timing; pass an
+    open text stream as output (e.g. sys.stdout) to also stream them as JSON lines.
+    Calls to unregistered functions or with bad parameters are rejected up front.
+    """
     with open(file_path, 'r') as file:
         questions_data = json.load(file)
-        
-        for question_data in questions_data:
-            question = question_data['question']
-            print(f"Question: {question}")
-            
-            for function_data in question_data['functions']:
-                function_name = function_data['name']
-                function_description = function_data['description']
-                function_parameters = function_data['parameters']
-                
-                print(f"Function: {function_name}")
-                print(f"Description: {function_description}")
-                
-                # Call the function dynamically
-                if function_name in globals():
-                    function = globals()[function_name]
-                    response = function(**function_parameters)
-                    print(f"Response: {response}")
-                else:
-                    print(f"Function {function_name} not found.")
+    registry = get_function_registry()
+    return run_calls(expand_questions(questions_data), registry.resolve, max_concurrency=max_concurrency,
+                     output=output, validate=registry.validate)
 
 # Weather API integration
 def get_weather(location):
-    base_url = "http://api.openweathermap.org/data/2.5/weather?"
-    complete_url = base_url + "q=" + location + "&appid=" + weather_api_key
-    response = requests.get(complete_url)
-    data = response.json()
-    
-    if data["cod"] != "404":
-        main = data["main"]
-        weather = data["weather"][0]
-        temperature = main["temp"]
-        description = weather["description"]
-        return f"The weather in {location} is currently {description} with a temperature of {temperature}°K."
-    else:
-        return "Location not found."
+    """Cached through the shared gateway; blocks the calling thread, not the bot's event loop."""
+    return get_gateway().get_weather_sync(location)
 
 # News API integration
 def get_latest_news():
-    base_url = "https://newsapi.org/v2/top-headlines?"
-    complete_url = base_url + "country=us&apiKey=" + news_api_key
-    response = requests.get(complete_url)
-    data = response.json()
-    
-    if data["status"] == "ok":
-        articles = data["articles"]
-        headlines = [article["title"] for article in articles[:5]]
-        return "Here are the latest news headlines:\n" + "\n".join(headlines)
-    else:
-        return "Failed to fetch news."
+    """Cached and held to the NewsAPI quota by the shared gateway."""
+    return get_gateway().get_latest_news_sync("us")
 
 # Financial data API integration
 def get_stock_price(symbol):
-    base_url = "https://www.alphavantage.co/query?"
-    complete_url = base_url + f"function=TIME_SERIES_INTRADAY&symbol={symbol}&interval=5min&apikey=" + alpha_vantage_api_key
-    response = requests.get(complete_url)
-    data = response.json()
-    
-    if "Time Series (5min)" in data:
-        latest_time = list(data["Time Series (5min)"].keys())[0]
-        latest_close = data["Time Series (5min)"][latest_time]["4. close"]
-        return f"The latest closing price of {symbol} is ${latest_close}."
-    else:
-        return "Failed to fetch stock price."
+    """Cached and held to the Alpha Vantage quota by the shared gateway."""
+    return get_gateway().get_stock_price_sync(symbol, "5min")
+
+
+# Bot handlers await these; answers are cached per location, country and symbol, and
+# concurrent identical lookups share one upstream request (see module/gateway.py)
+async def get_weather_async(location: str) -> str:
+    return await get_gateway().get_weather(location)
+
+
+async def get_latest_news_async(country: str = "us") -> str:
+    return await get_gateway().get_latest_news(country)
+
+
+async def get_stock_price_async(symbol: str, interval: str = "5min") -> str:
+    return await get_gateway().get_stock_price(symbol, interval)
+
+def report_import_costs() -> dict:
+    """Measure and print what each lazily imported integration costs to import at start-up."""
+    report = measure_import_costs()
+    print_import_report(report)
+    return report
 
 # Translation API integration
 def translate_text(text, dest_language):
-    translator = Translator()
-    translation = translator.translate(text, dest=dest_language)
-    return translation.text
+    return get_translation_memory().translate(text, dest_language)
+
 
-if __name__ ==
\ No newline at end of file
+def translate_texts(texts, dest_language):
+    """Translate many strings in one call; only strings not yet in the translation memory go to the API."""
+    return get_translation_memory().translate_batch(texts, dest_language)
@@ -1,6 +1,12 @@
-import random
 import json
 
+try:
+    from module.reasoning import (DAVINCI_PERSPECTIVE, INTUITION_PERSPECTIVE, KINDNESS_PERSPECTIVE,
+                                  NEURAL_PERSPECTIVE, QUANTUM_PERSPECTIVE, Perspective, ReasoningEngine)
+except ImportError:  # imported as a top-level module from inside module/
+    from reasoning import (DAVINCI_PERSPECTIVE, INTUITION_PERSPECTIVE, KINDNESS_PERSPECTIVE, NEURAL_PERSPECTIVE,
+                           QUANTUM_PERSPECTIVE, Perspective, ReasoningEngine)
+
 # Load JSON configuration
 def load_json_config(file_path):
     with open(file_path, 'r') as file:
@@ -31,92 +37,76 @@ def davinci_insights(question):
     return perspectives
 
 def think_like_davinci(question):
-    perspectives = [
-        f"What if we view '{question}' from the perspective of the stars?",
-        f"Consider '{question}' as if it's a masterpiece of the universe.",
-        f"Reflect on '{question}' through the lens of nature's design."
-    ]
-    return random.choice(perspectives)
+    return DAVINCI_PERSPECTIVE(question)
 
 # Human Intuition
 def human_intuition(question):
-    intuition = random.choice([
-        "How does this question make you feel?",
-        "What emotional connection do you have with this topic?",
-        "What does your gut instinct tell you about this?"
-    ])
-    return intuition
+    return INTUITION_PERSPECTIVE(question)
 
 # Neural Networks (AI perspective)
 def neural_network_thinking(question):
-    neural_perspectives = [
-        f"Process '{question}' through a multi-layered neural network.",
-        f"Apply deep learning to uncover hidden insights about '{question}'.",
-        f"Use machine learning to predict patterns in '{question}'."
-    ]
-    return random.choice(neural_perspectives)
+    return NEURAL_PERSPECTIVE(question)
 
 # Quantum Computing (cutting-edge technology)
 def quantum_computing_thinking(question):
-    quantum_perspectives = [
-        f"Consider '{question}' using quantum superposition principles.",
-        f"Apply quantum entanglement to find connections in '{question}'.",
-        f"Utilize quantum computing to solve '{question}' more efficiently."
-    ]
-    return random.choice(quantum_perspectives)
+    return QUANTUM_PERSPECTIVE(question)
 
 # Resilient Kindness
 def resilient_kindness(question):
-    kindness_perspectives = [
-        "Despite losing everything, seeing life as a chance to grow.",
-        "Finding strength in kindness after facing life's hardest trials.",
-        "Embracing every challenge as an opportunity for growth and compassion."
-    ]
-    return random.choice(kindness_perspectives)
+    return KINDNESS_PERSPECTIVE(question)
 
 # Mathematical Perspective
+MATH_PERSPECTIVE = Perspective("mathematical_perspective", templates=(
+    "Analyze '{question}' using statistical methods.",
+    "Apply mathematical modeling to understand '{question}'.",
+    "Use calculus to explore the changes in '{question}'.",
+))
+
 def mathematical_perspective(question):
-    math_perspectives = [
-        f"Analyze '{question}' using statistical methods.",
-        f"Apply mathematical modeling to understand '{question}'.",
-        f"Use calculus to explore the changes in '{question}'."
-    ]
-    return random.choice(math_perspectives)
+    return MATH_PERSPECTIVE(question)
 
 # Philosophical Perspective
+PHILOSOPHY_PERSPECTIVE = Perspective("philosophical_perspective", templates=(
+    "Contemplate '{question}' through the lens of existentialism.",
+    "Consider '{question}' from a utilitarian perspective.",
+    "Reflect on '{question}' using the principles of stoicism.",
+))
+
 def philosophical_perspective(question):
-    philosophy_perspectives = [
-        f"Contemplate '{question}' through the lens of existentialism.",
-        f"Consider '{question}' from a utilitarian perspective.",
-        f"Reflect on '{question}' using the principles of stoicism."
-    ]
-    return random.choice(philosophy_perspectives)
+    return PHILOSOPHY_PERSPECTIVE(question)
 
 # Copilot's Perspective
+COPILOT_PERSPECTIVE = Perspective("copilot_perspective", templates=(
+    "Let's break down '{question}' step by step to find a solution.",
+    "Consider '{question}' from a collaborative angle, leveraging diverse insights.",
+    "Use structured thinking to approach '{question}' methodically.",
+))
+
 def copilot_perspective(question):
-    copilot_responses = [
-        f"Let's break down '{question}' step by step to find a solution.",
-        f"Consider '{question}' from a collaborative angle, leveraging diverse insights.",
-        f"Use structured thinking to approach '{question}' methodically."
-    ]
-    return random.choice(copilot_responses)
+    return COPILOT_PERSPECTIVE(question)
+
+# Adhering to ethical principles
+def ethical_considerations(question):
+    return "Always act with transparency, fairness, and respect for privacy."
+
+# All perspectives, run concurrently; register() more (sync or async) to extend the reasoning.
+# Random choices come from template perspectives so the engine can seed them.
+reasoning_engine = ReasoningEngine([
+    Perspective("newton_thoughts", function=newton_thoughts, deterministic=True),
+    DAVINCI_PERSPECTIVE,
+    INTUITION_PERSPECTIVE,
+    NEURAL_PERSPECTIVE,
+    QUANTUM_PERSPECTIVE,
+    KINDNESS_PERSPECTIVE,
+    MATH_PERSPECTIVE,
+    PHILOSOPHY_PERSPECTIVE,
+    COPILOT_PERSPECTIVE,
+    Perspective("ethical_considerations", function=ethical_considerations, deterministic=True),
+])
 
 # Universal reasoning with all perspectives
 def universal_reasoning(question):
-    newton_response = newton_thoughts(question)
-    davinci_response = davinci_insights(question)
-    human_response = human_intuition(question)
-    neural_network_response = neural_network_thinking(question)
-    quantum_response = quantum_computing_thinking(question)
-    kindness_response = resilient_kindness(question)
-    math_response = mathematical_perspective(question)
-    philosophy_response = philosophical_perspective(question)
-    copilot_response = copilot_perspective(question)
-    
-    # Adhering to ethical principles
-    ethical_considerations = "Always act with transparency, fairness, and respect for privacy."
-    
-    return f"{newton_response}\n{davinci_response}\n{human_response}\n{neural_network_response}\n{quantum_response}\n{kindness_response}\n{math_response}\n{philosophy_response}\n{copilot_response}\n{ethical_considerations}"
+    return reasoning_engine.reason(question)
 
 def main():
     config = load_json_config('config.json')
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from module.lazy import lazy_import
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+joblib = lazy_import("joblib", "sklearn_preprocessing")
+scipy_sparse = lazy_import("scipy.sparse", "sklearn_preprocessing")
+
+artifact_dir = os.getenv('PI_ARTIFACT_DIR', os.path.join('.cache', 'artifacts'))
+artifact_cache_enabled = os.getenv('PI_ARTIFACT_CACHE', 'true').lower() in ('1', 'true', 'yes')
+
+MANIFEST = "manifest.json"
+DIGESTS = "digests.json"
+
+
+def save_csr(path, X):
+	"""Write a sparse matrix as a directory of data/indices/indptr .npy files that load_csr can memory-map."""
+	X = X.tocsr()
+	os.makedirs(path, exist_ok=True)
+	np.save(os.path.join(path, "data.npy"), X.data)
+	np.save(os.path.join(path, "indices.npy"), X.indices)
+	np.save(os.path.join(path, "indptr.npy"), X.indptr)
+	return list(X.shape)
+
+
+def load_csr(path, shape, mmap_mode='r'):
+	arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+			  for name in ("data", "indices", "indptr")}
+	return scipy_sparse.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=tuple(shape), copy=False)
+
+
+def file_digest(file_path, block_size=1 << 20):
+	"""Return the SHA-256 hex digest of a file's contents."""
+	digest = hashlib.sha256()
+	with open(file_path, 'rb') as file:
+		for block in iter(lambda: file.read(block_size), b""):
+			digest.update(block)
+	return digest.hexdigest()
+
+
+class ArtifactCache:
+	"""Content-addressed store for the outputs of expensive preprocessing runs.
+
+	An entry's key is the SHA-256 of its input file's contents plus a JSON
+	config, so any change to either builds a new entry and unchanged inputs are
+	never rebuilt. Entries are directories: sparse matrices become CSR .npy
+	triples and plain arrays .npy files, both opened with mmap_mode on load, and
+	anything else is stored with joblib. Entries are built in a temporary
+	directory and renamed into place, so readers never see a partial one.
+
+	File digests are remembered by path, size and mtime, so an unchanged file is
+	hashed once rather than on every lookup.
+	"""
+
+	def __init__(self, root=artifact_dir):
+		self.root = root
+		self._lock = threading.Lock()
+		os.makedirs(root, exist_ok=True)
+
+	def key(self, file_path, config):
+		"""Return the entry key for file_path processed under config (a JSON-serialisable dict)."""
+		payload = json.dumps({"input": self.digest(file_path), "config": config}, sort_keys=True, default=str)
+		return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+	def digest(self, file_path):
+		stat = os.stat(file_path)
+		fingerprint = [stat.st_size, stat.st_mtime_ns]
+		path = os.path.abspath(file_path)
+		with self._lock:
+			digests = self._read_digests()
+			known = digests.get(path)
+			if known is not None and known["fingerprint"] == fingerprint:
+				return known["sha256"]
+		start = time.perf_counter()
+		sha256 = file_digest(file_path)
+		logging.info(f"Hashed {file_path} ({stat.st_size} bytes) in {time.perf_counter() - start:.2f}s")
+		with self._lock:
+			digests = self._read_digests()
+			digests[path] = {"fingerprint": fingerprint, "sha256": sha256}
+			self._write_json(os.path.join(self.root, DIGESTS), digests)
+		return sha256
+
+	def path(self, key):
+		return os.path.join(self.root, key)
+
+	def __contains__(self, key):
+		return os.path.isfile(os.path.join(self.path(key), MANIFEST))
+
+	def load(self, key, mmap_mode='r'):
+		"""Return the artifacts stored under key as a dict, or None if there is no such entry."""
+		entry = self.path(key)
+		try:
+			with open(os.path.join(entry, MANIFEST), 'r', encoding='utf-8') as file:
+				manifest = json.load(file)
+		except FileNotFoundError:
+			return None
+		artifacts = {}
+		for name, spec in manifest["artifacts"].items():
+			location = os.path.join(entry, spec["file"])
+			if spec["kind"] == "csr":
+				artifacts[name] = load_csr(location, spec["shape"], mmap_mode)
+			elif spec["kind"] == "npy":
+				artifacts[name] = np.load(location, mmap_mode=mmap_mode)
+			else:
+				artifacts[name] = joblib.load(location, mmap_mode=mmap_mode)
+		return artifacts
+
+	def save(self, key, artifacts, config=None, build_dir=None):
+		"""Store a dict of artifacts under key, moving build_dir's other files into the entry too."""
+		entry = self.path(key)
+		work = build_dir or tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=self.root)
+		specs = {}
+		for name, value in artifacts.items():
+			if scipy_sparse.issparse(value):
+				specs[name] = {"kind": "csr", "file": f"{name}.csr", "shape": save_csr(os.path.join(work, f"{name}.csr"), value)}
+			elif isinstance(value, np.ndarray) and value.dtype != object:
+				np.save(os.path.join(work, f"{name}.npy"), value)
+				specs[name] = {"kind": "npy", "file": f"{name}.npy"}
+			else:
+				joblib.dump(value, os.path.join(work, f"{name}.joblib"))
+				specs[name] = {"kind": "joblib", "file": f"{name}.joblib"}
+		self._write_json(os.path.join(work, MANIFEST), {"key": key, "config": config, "created": time.time(),
+													   "artifacts": specs})
+		try:
+			os.rename(work, entry)
+		except OSError:
+			# Another process stored the same entry first; it has the same content
+			shutil.rmtree(work, ignore_errors=True)
+		return entry
+
+	def get_or_build(self, key, build, config=None):
+		"""Return the artifacts under key, calling build(build_dir) to create and store them on a miss.
+
+		build returns a dict of artifacts; it may also write files of its own into
+		build_dir, which end up in the entry directory at self.path(key).
+		"""
+		artifacts = self.load(key)
+		if artifacts is not None:
+			logging.info(f"Loaded preprocessing artifacts {key[:12]} from {self.root}")
+			return artifacts
+		start = time.perf_counter()
+		build_dir = tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=self.root)
+		try:
+			self.save(key, build(build_dir), config=config, build_dir=build_dir)
+		except BaseException:
+			shutil.rmtree(build_dir, ignore_errors=True)
+			raise
+		logging.info(f"Built preprocessing artifacts {key[:12]} in {time.perf_counter() - start:.2f}s")
+		return self.load(key)
+
+	def _read_digests(self):
+		try:
+			with open(os.path.join(self.root, DIGESTS), 'r', encoding='utf-8') as file:
+				return json.load(file)
+		except (FileNotFoundError, ValueError):
+			return {}
+
+	@staticmethod
+	def _write_json(path, document):
+		temporary = f"{path}.{os.getpid()}.tmp"
+		with open(temporary, 'w', encoding='utf-8') as file:
+			json.dump(document, file)
+		os.replace(temporary, path)
+
+
+_artifact_cache = None
+
+
+def get_artifact_cache():
+	"""Return the shared ArtifactCache."""
+	global _artifact_cache
+	if _artifact_cache is None:
+		_artifact_cache = ArtifactCache()
+	return _artifact_cache
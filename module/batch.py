@@ -0,0 +1,87 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+batch_max_concurrency = int(os.getenv('PI_BATCH_MAX_CONCURRENCY', '8'))
+
+
+def expand_questions(questions_data):
+	"""Flatten questions.json entries into one call per listed function, in file order."""
+	calls = []
+	for question_data in questions_data:
+		for function_data in question_data['functions']:
+			calls.append({
+				"index": len(calls),
+				"question": question_data['question'],
+				"function": function_data['name'],
+				"parameters": function_data.get('parameters', {}),
+			})
+	return calls
+
+
+def _execute(call, resolve, batch_start):
+	record = dict(call)
+	start = time.perf_counter()
+	record["started"] = round(start - batch_start, 6)
+	function = resolve(call["function"])
+	if function is None:
+		record.update(status="not_found", error=f"Function {call['function']} not found.")
+	else:
+		try:
+			response = function(**call["parameters"])
+			if asyncio.iscoroutine(response):
+				response = asyncio.run(response)
+			record.update(status="ok", response=response)
+		except Exception as e:
+			logging.error(f"Error calling {call['function']} for call {call['index']}: {e}")
+			record.update(status="error", error=str(e))
+	record["seconds"] = round(time.perf_counter() - start, 6)
+	return record
+
+
+def _rejected(call, error):
+	return {**call, "started": 0.0, "status": "invalid", "error": str(error), "seconds": 0.0}
+
+
+def run_calls(calls, resolve, max_concurrency=batch_max_concurrency, output=None, validate=None):
+	"""Run independent function calls concurrently and return one record per call, in input order.
+
+	resolve maps a function name to a callable, or None when it is unknown. At
+	most max_concurrency calls run at a time; coroutine functions run on their own
+	event loop in the worker thread. Each record carries the call, its status
+	(ok, error or not_found), the response or error, and when it started and how
+	long it took in seconds. When output is a writable text stream, records are
+	written to it as JSON lines as soon as every earlier call has finished.
+
+	validate(name, parameters), if given, runs for each call before it is
+	scheduled; calls it rejects with a ValueError are recorded as invalid and
+	never executed.
+	"""
+	batch_start = time.perf_counter()
+	records = []
+	with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="batch") as executor:
+		futures = []
+		for call in calls:
+			try:
+				if validate is not None:
+					validate(call["function"], call["parameters"])
+			except ValueError as e:
+				futures.append(_rejected(call, e))
+			else:
+				futures.append(executor.submit(_execute, call, resolve, batch_start))
+		for future in futures:
+			record = future if isinstance(future, dict) else future.result()
+			records.append(record)
+			if output is not None:
+				output.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+				output.flush()
+	wall = time.perf_counter() - batch_start
+	busy = sum(record["seconds"] for record in records)
+	logging.info(f"Ran {len(records)} calls in {wall:.2f}s ({busy:.2f}s of call time, concurrency {max_concurrency})")
+	return records
@@ -0,0 +1,104 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+	from module.utils import connect_to_database, get_database_info
+except ImportError:  # imported as a top-level module from inside module/
+	from utils import connect_to_database, get_database_info
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+bootstrap_marker_dir = os.getenv('PI_BOOTSTRAP_DIR', '.bootstrap')
+
+_completed = set()
+_lock = threading.Lock()
+_applications = {}
+_application_lock = threading.Lock()
+
+
+def _marker_path(marker_dir, name):
+	return os.path.join(marker_dir, f"{name}.done")
+
+
+def _is_complete(name, marker_dir, verify):
+	if name in _completed:
+		return True
+	if not os.path.exists(_marker_path(marker_dir, name)):
+		return False
+	# A marker only counts while the artifact it stands for is still there
+	return verify is None or verify()
+
+
+def _run_step(name, step, marker_dir):
+	start = time.perf_counter()
+	try:
+		ok = step() is not False
+	except Exception as e:
+		logging.error(f"Bootstrap step '{name}' failed: {e}")
+		return "failed"
+	if not ok:
+		logging.error(f"Bootstrap step '{name}' did not complete.")
+		return "failed"
+	os.makedirs(marker_dir, exist_ok=True)
+	with open(_marker_path(marker_dir, name), 'w') as file:
+		file.write(f"{time.time()}\n")
+	logging.info(f"Bootstrap step '{name}' completed in {time.perf_counter() - start:.2f}s")
+	return "done"
+
+
+def run_bootstrap_steps(steps, verify=None, parallel=True, marker_dir=bootstrap_marker_dir):
+	"""Run each named setup step at most once and return {name: 'cached'|'done'|'failed'}.
+
+	steps maps a name to a callable; returning False (or raising) marks the step
+	as failed. Successful steps leave a completion marker in marker_dir so later
+	processes skip them; verify may map a name to a callable that checks the
+	step's artifact still exists before its marker is trusted. Pending steps run
+	concurrently in threads when parallel is true.
+	"""
+	verify = verify or {}
+	with _lock:
+		results = {name: "cached" for name in steps if _is_complete(name, marker_dir, verify.get(name))}
+		pending = [name for name in steps if name not in results]
+		if parallel and len(pending) > 1:
+			with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="bootstrap") as executor:
+				statuses = executor.map(lambda name: _run_step(name, steps[name], marker_dir), pending)
+				results.update(zip(pending, statuses))
+		else:
+			for name in pending:
+				results[name] = _run_step(name, steps[name], marker_dir)
+		_completed.update(name for name, status in results.items() if status != "failed")
+	return results
+
+
+def bootstrap_application(db_path, ensure_database, steps=None, consent=None, on_ready=None, parallel=True,
+		marker_dir=bootstrap_marker_dir):
+	"""Prepare the application once per process and return (conn, db_info), or (None, None).
+
+	consent, when given, is asked first and a False answer skips everything.
+	ensure_database runs as the "database" step alongside any extra steps, then
+	on_ready is called and db_path is opened and its schema read. Later calls for
+	the same db_path return the first successful result.
+	"""
+	with _application_lock:
+		if db_path in _applications:
+			return _applications[db_path]
+		if consent is not None and not consent():
+			logging.info("User declined consent. Skipping application bootstrap.")
+			return None, None
+		run_bootstrap_steps({"database": ensure_database, **(steps or {})},
+							verify={"database": lambda: os.path.exists(db_path)}, parallel=parallel,
+							marker_dir=marker_dir)
+		if on_ready is not None:
+			on_ready()
+		conn = connect_to_database(db_path)
+		if not conn:
+			logging.error("Failed to connect to the database.")
+			return None, None
+		db_info = get_database_info(conn)
+		logging.info(f"Database info: {db_info}")
+		_applications[db_path] = (conn, db_info)
+		return conn, db_info
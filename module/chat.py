@@ -1,13 +1,18 @@
+import atexit
+import asyncio
+import importlib.util
+import json
 import logging
 import os
+import weakref
 from pathlib import Path
+from urllib.parse import urlsplit
 
 import httpx
-import openai
 from dotenv import load_dotenv
 from tenacity import retry, wait_random_exponential, stop_after_attempt
 
-from module.bias_detection import evaluate_bias
+from module.lazy import lazy_import
 
 # Load environment variables from .env file
 load_dotenv()
@@ -19,7 +24,7 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 openai_api_key = os.getenv('OPENAI_API_KEY')
 if not openai_api_key:
 	logging.error("OpenAI API key not found in environment variables.")
-openai.api_key = openai_api_key
+openai = lazy_import("openai", "openai", on_load=lambda module: setattr(module, "api_key", openai_api_key))
 
 # Set your Azure OpenAI API key and endpoint
 azure_openai_api_key = os.getenv('AZURE_OPENAI_API_KEY')
@@ -27,6 +32,99 @@ azure_openai_endpoint = os.getenv('AZURE_OPENAI_ENDPOINT')
 if not azure_openai_api_key or not azure_openai_endpoint:
 	logging.error("Azure OpenAI API key or endpoint not found in environment variables.")
 
+# Shared HTTP client settings
+http_timeout = float(os.getenv('PI_HTTP_TIMEOUT', '30'))
+http_connect_timeout = float(os.getenv('PI_HTTP_CONNECT_TIMEOUT', '5'))
+http_max_connections = int(os.getenv('PI_HTTP_MAX_CONNECTIONS', '20'))
+http_max_keepalive_connections = int(os.getenv('PI_HTTP_MAX_KEEPALIVE_CONNECTIONS', '10'))
+http_keepalive_expiry = float(os.getenv('PI_HTTP_KEEPALIVE_EXPIRY', '30'))
+http_max_connections_per_host = int(os.getenv('PI_HTTP_MAX_CONNECTIONS_PER_HOST', '10'))
+
+# HTTP/2 needs the optional 'h2' package (pip install httpx[http2])
+http2_enabled = importlib.util.find_spec('h2') is not None
+if not http2_enabled:
+	logging.warning("Package 'h2' not installed; shared HTTP clients will use HTTP/1.1.")
+
+# HTTP statuses worth another attempt: throttling, timeouts and server-side failures
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+_http_client = None
+# Async clients and per-host semaphores belong to the event loop that created them, so each loop gets its own
+_async_http_clients = weakref.WeakKeyDictionary()
+_host_semaphores = weakref.WeakKeyDictionary()
+
+
+def _http_client_options():
+	"""Build the keyword arguments shared by the pooled sync and async clients."""
+	return {
+		"http2": http2_enabled,
+		"timeout": httpx.Timeout(http_timeout, connect=http_connect_timeout),
+		"limits": httpx.Limits(
+			max_connections=http_max_connections,
+			max_keepalive_connections=http_max_keepalive_connections,
+			keepalive_expiry=http_keepalive_expiry,
+		),
+	}
+
+
+def get_http_client():
+	"""Return the process-wide pooled httpx.Client, creating it on first use."""
+	global _http_client
+	if _http_client is None or _http_client.is_closed:
+		_http_client = httpx.Client(**_http_client_options())
+	return _http_client
+
+
+def create_async_http_client():
+	"""Return a new pooled httpx.AsyncClient with the shared settings, for an event loop of its own."""
+	return httpx.AsyncClient(**_http_client_options())
+
+
+def get_async_http_client():
+	"""Return the running event loop's pooled httpx.AsyncClient, creating it on first use."""
+	loop = asyncio.get_running_loop()
+	client = _async_http_clients.get(loop)
+	if client is None or client.is_closed:
+		client = _async_http_clients[loop] = create_async_http_client()
+	return client
+
+
+def _host_semaphore(url):
+	"""Return the running loop's semaphore that caps concurrent async requests to the host of url."""
+	semaphores = _host_semaphores.setdefault(asyncio.get_running_loop(), {})
+	host = urlsplit(url).netloc
+	if host not in semaphores:
+		semaphores[host] = asyncio.Semaphore(http_max_connections_per_host)
+	return semaphores[host]
+
+
+def is_retryable_error(exception):
+	"""Return whether a failed request is worth retrying: transport errors and RETRYABLE_STATUS_CODES."""
+	if isinstance(exception, httpx.HTTPStatusError):
+		return exception.response.status_code in RETRYABLE_STATUS_CODES
+	return isinstance(exception, httpx.RequestError)
+
+
+async def close_http_clients():
+	"""Close the shared HTTP clients; call this when the bot application shuts down."""
+	global _http_client
+	loop = asyncio.get_running_loop()
+	client = _async_http_clients.pop(loop, None)
+	if client is not None:
+		await client.aclose()
+	_host_semaphores.pop(loop, None)
+	if _http_client is not None:
+		_http_client.close()
+		_http_client = None
+
+
+def _close_sync_http_client():
+	if _http_client is not None:
+		_http_client.close()
+
+
+atexit.register(_close_sync_http_client)
+
 
 @retry(wait=wait_random_exponential(min=1, max=40), stop=stop_after_attempt(3))
 def chat_completion_request(messages, model="gpt-4"):
@@ -104,7 +202,7 @@ def create_fine_tuning_job(model, training_file_id):
 
 def make_post_request(url, data):
 	try:
-		response = httpx.post(url, json=data)
+		response = get_http_client().post(url, json=data)
 		logging.info(f"Response status code: {response.status_code}")
 		logging.info(f"Response headers: {response.headers}")
 		return response
@@ -115,26 +213,85 @@ def make_post_request(url, data):
 
 
 def azure_chat_completion_request(messages, model="deployment-name"):
+	"""Azure chat completion over the shared keep-alive Client; raises httpx.HTTPStatusError on failure."""
+	headers = {
+		"Content-Type": "application/json",
+		"api-key": azure_openai_api_key
+	}
+	payload = {
+		"model": model,
+		"messages": messages
+	}
+	response = get_http_client().post(azure_openai_endpoint, headers=headers, json=payload)
 	try:
-		headers = {
-			"Content-Type": "application/json",
-			"api-key": azure_openai_api_key
-		}
-		payload = {
-			"model": model,
-			"messages": messages
-		}
-		response = httpx.post(azure_openai_endpoint, headers=headers, json=payload)
 		response.raise_for_status()
-		return response.json()["choices"][0]["message"]["content"].strip()
 	except httpx.HTTPStatusError as e:
-		logging.error("Unable to generate Azure ChatCompletion response")
-		logging.error(f"Exception: {e}")
-		return str(e)
+		logging.error(f"Unable to generate Azure ChatCompletion response: {e}")
+		raise
+	return response.json()["choices"][0]["message"]["content"].strip()
+
+
+async def azure_chat_completion_request_async(messages, model="deployment-name", endpoint=None, api_key=None):
+	"""Awaitable Azure chat completion over the loop's keep-alive AsyncClient; raises httpx.HTTPStatusError on failure.
+
+	Errors are raised rather than returned so callers can retry the transient
+	ones (see is_retryable_error) and never show error text to users.
+	"""
+	endpoint = endpoint or azure_openai_endpoint
+	headers = {
+		"Content-Type": "application/json",
+		"api-key": api_key or azure_openai_api_key
+	}
+	payload = {
+		"model": model,
+		"messages": messages
+	}
+	async with _host_semaphore(endpoint):
+		response = await get_async_http_client().post(endpoint, headers=headers, json=payload)
+	try:
+		response.raise_for_status()
+	except httpx.HTTPStatusError as e:
+		logging.error(f"Unable to generate Azure ChatCompletion response: {e}")
+		raise
+	return response.json()["choices"][0]["message"]["content"].strip()
+
+
+async def azure_chat_completion_stream(messages, model="deployment-name", endpoint=None, api_key=None):
+	"""Yield the content deltas of a streamed Azure chat completion as they arrive.
+
+	Requests the completion with "stream": true and parses the server-sent events
+	line by line. HTTP errors are raised before the first delta is yielded.
+	"""
+	endpoint = endpoint or azure_openai_endpoint
+	headers = {
+		"Content-Type": "application/json",
+		"Accept": "text/event-stream",
+		"api-key": api_key or azure_openai_api_key
+	}
+	payload = {
+		"model": model,
+		"messages": messages,
+		"stream": True
+	}
+	async with _host_semaphore(endpoint):
+		async with get_async_http_client().stream("POST", endpoint, headers=headers, json=payload) as response:
+			response.raise_for_status()
+			async for line in response.aiter_lines():
+				if not line.startswith("data:"):
+					continue
+				data = line[5:].strip()
+				if data == "[DONE]":
+					break
+				choices = json.loads(data).get("choices") or []
+				delta = choices[0].get("delta", {}).get("content") if choices else None
+				if delta:
+					yield delta
 
 
 def evaluate_and_mitigate_bias(df, label_name, protected_attribute_name, privileged_groups, unprivileged_groups):
 	"""Evaluate and mitigate bias in the dataset."""
+	# aif360 is heavy to import, so bias tooling is only loaded when it is used
+	from module.bias_detection import evaluate_bias
 	return evaluate_bias(df, label_name, protected_attribute_name, privileged_groups, unprivileged_groups)
 
 # Example usage of evaluate_and_mitigate_bias function
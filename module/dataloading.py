@@ -0,0 +1,221 @@
+import logging
+import math
+import os
+import time
+
+try:
+	from module.lazy import lazy_import
+except ImportError:
+	from lazy import lazy_import
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+torch = lazy_import("torch", "torch")
+torch_data = lazy_import("torch.utils.data", "torch")
+
+loader_workers = int(os.getenv('PI_LOADER_WORKERS', str(min(4, os.cpu_count() or 1))))
+loader_prefetch_factor = int(os.getenv('PI_LOADER_PREFETCH', '4'))
+loader_persistent_workers = os.getenv('PI_LOADER_PERSISTENT', 'true').lower() in ('1', 'true', 'yes')
+# "auto" pins host memory only when batches will be copied to a GPU
+loader_pin_memory = os.getenv('PI_LOADER_PIN_MEMORY', 'auto').lower()
+train_batch_size = int(os.getenv('PI_BATCH_SIZE', '256'))
+# Batch size the base learning rate was tuned for, and how to scale it for other sizes: linear, sqrt or none
+base_batch_size = int(os.getenv('PI_BASE_BATCH_SIZE', '32'))
+lr_scaling = os.getenv('PI_LR_SCALING', 'sqrt')
+# Datasets up to this many bytes once decoded are preloaded into one tensor per field
+preload_max_bytes = int(os.getenv('PI_PRELOAD_MAX_BYTES', str(1 << 30)))
+
+
+def scaled_learning_rate(learning_rate, batch_size, base=base_batch_size, rule=lr_scaling):
+	"""Scale a learning rate tuned at batch size base to batch_size.
+
+	"linear" multiplies by batch_size / base (the usual rule for SGD), "sqrt" by
+	its square root (gentler, and better suited to Adam), "none" leaves it alone.
+	"""
+	ratio = batch_size / base
+	if rule == "linear":
+		return learning_rate * ratio
+	if rule == "sqrt":
+		return learning_rate * math.sqrt(ratio)
+	if rule == "none":
+		return learning_rate
+	raise ValueError(f"Unknown learning-rate scaling rule '{rule}'")
+
+
+class LoaderConfig:
+	"""How training batches are produced; defaults come from the PI_LOADER_* settings.
+
+	workers > 0 loads samples in that many processes, kept alive between epochs
+	when persistent is true and each holding prefetch_factor batches ready.
+	preload decodes the whole dataset into tensors once so batches are plain
+	tensor slices with no per-sample Python work. The dataset's transforms run
+	only during that one pass, so random augmentations (crops, flips, noise) are
+	frozen into the first draw for every epoch; "auto" therefore preloads only
+	datasets without transforms that fit in preload_max_bytes. Pass preload=True
+	for datasets whose transforms are deterministic.
+	"""
+
+	def __init__(self, batch_size=train_batch_size, workers=loader_workers, persistent=loader_persistent_workers,
+				 prefetch_factor=loader_prefetch_factor, pin_memory=loader_pin_memory, preload="auto",
+				 shuffle=True, drop_last=False):
+		self.batch_size = batch_size
+		self.workers = workers
+		self.persistent = persistent
+		self.prefetch_factor = prefetch_factor
+		self.pin_memory = pin_memory
+		self.preload = preload
+		self.shuffle = shuffle
+		self.drop_last = drop_last
+
+	def __repr__(self):
+		return (f"LoaderConfig(batch_size={self.batch_size}, workers={self.workers}, persistent={self.persistent}, "
+				f"prefetch_factor={self.prefetch_factor}, pin_memory={self.pin_memory}, preload={self.preload})")
+
+	def pins_memory(self):
+		if self.pin_memory == "auto":
+			return torch.cuda.is_available()
+		return self.pin_memory in (True, "1", "true", "yes")
+
+
+class TensorBatchLoader:
+	"""Batches from in-memory tensors by index slicing, one gather per field instead of one call per sample.
+
+	Iterates like a DataLoader over a TensorDataset, yielding a list of tensors
+	per batch, but without the per-sample __getitem__ and collate overhead.
+	"""
+
+	def __init__(self, tensors, batch_size, shuffle=True, drop_last=False, pin_memory=False, generator=None):
+		self.tensors = tuple(tensor.pin_memory() if pin_memory else tensor for tensor in tensors)
+		self.batch_size = batch_size
+		self.shuffle = shuffle
+		self.drop_last = drop_last
+		self.generator = generator
+		self.dataset = torch_data.TensorDataset(*self.tensors)
+
+	def __len__(self):
+		rows = len(self.tensors[0])
+		return rows // self.batch_size if self.drop_last else math.ceil(rows / self.batch_size)
+
+	def __iter__(self):
+		rows = len(self.tensors[0])
+		order = torch.randperm(rows, generator=self.generator) if self.shuffle else None
+		for start in range(0, len(self) * self.batch_size, self.batch_size):
+			if order is None:
+				yield [tensor[start:start + self.batch_size] for tensor in self.tensors]
+			else:
+				index = order[start:start + self.batch_size]
+				yield [tensor[index] for tensor in self.tensors]
+
+
+def preload_dataset(dataset, workers=loader_workers, batch_size=1024):
+	"""Decode every sample of dataset once and return a TensorDataset holding the results."""
+	start = time.perf_counter()
+	loader = torch_data.DataLoader(dataset, batch_size=batch_size, shuffle=False, num_workers=workers)
+	fields = None
+	for batch in loader:
+		batch = batch if isinstance(batch, (list, tuple)) else [batch]
+		if fields is None:
+			fields = [[] for _ in batch]
+		for parts, tensor in zip(fields, batch):
+			parts.append(tensor)
+	tensors = [torch.cat(parts) for parts in fields or []]
+	size = sum(tensor.element_size() * tensor.nelement() for tensor in tensors)
+	logging.info(f"Preloaded {len(dataset)} samples ({size / (1 << 20):.1f} MB) in {time.perf_counter() - start:.2f}s")
+	return torch_data.TensorDataset(*tensors)
+
+
+def estimated_bytes(dataset):
+	"""Estimate the decoded size of dataset from its first sample."""
+	sample = dataset[0]
+	sample = sample if isinstance(sample, (list, tuple)) else [sample]
+	per_sample = sum(torch.as_tensor(field).element_size() * torch.as_tensor(field).nelement() for field in sample)
+	return per_sample * len(dataset)
+
+
+def has_transforms(dataset):
+	"""Whether dataset applies per-sample transforms (the torchvision transform attributes)."""
+	return any(getattr(dataset, name, None) is not None for name in ("transform", "target_transform", "transforms"))
+
+
+def make_loader(dataset, config=None):
+	"""Return an iterable of training batches for dataset configured by config (a LoaderConfig)."""
+	config = config or LoaderConfig()
+	preload = config.preload
+	if preload == "auto":
+		preload = isinstance(dataset, torch_data.TensorDataset) or (
+			not has_transforms(dataset) and estimated_bytes(dataset) <= preload_max_bytes
+		)
+	if preload:
+		if not isinstance(dataset, torch_data.TensorDataset):
+			dataset = preload_dataset(dataset, config.workers)
+		return TensorBatchLoader(dataset.tensors, config.batch_size, shuffle=config.shuffle,
+								 drop_last=config.drop_last, pin_memory=config.pins_memory())
+	options = {}
+	if config.workers > 0:
+		options.update(persistent_workers=config.persistent, prefetch_factor=config.prefetch_factor)
+	return torch_data.DataLoader(dataset, batch_size=config.batch_size, shuffle=config.shuffle,
+								 num_workers=config.workers, pin_memory=config.pins_memory(),
+								 drop_last=config.drop_last, **options)
+
+
+def default_benchmark_configs():
+	"""Baseline (what training used before) and the configurations worth comparing to it."""
+	workers = max(1, loader_workers)
+	return {
+		"baseline (bs 32, 0 workers)": LoaderConfig(batch_size=32, workers=0, preload=False),
+		f"bs 32, {workers} workers": LoaderConfig(batch_size=32, workers=workers, preload=False),
+		f"bs 256, {workers} workers": LoaderConfig(batch_size=256, workers=workers, preload=False),
+		"bs 256, preloaded": LoaderConfig(batch_size=256, workers=0, preload=True),
+		"bs 1024, preloaded": LoaderConfig(batch_size=1024, workers=0, preload=True),
+	}
+
+
+def benchmark_loaders(dataset, configs=None, epochs=2, max_batches=None, step=None):
+	"""Measure samples/sec of each loader configuration on dataset (on CPU).
+
+	Each configuration is built once (preloading counts as setup_seconds) and
+	iterated for epochs epochs, so persistent workers show their benefit after
+	the first. step(batch), if given, runs for every batch, e.g. a training
+	step, to measure end-to-end throughput rather than loading alone.
+	"""
+	results = []
+	for name, config in (configs or default_benchmark_configs()).items():
+		start = time.perf_counter()
+		loader = make_loader(dataset, config)
+		setup = time.perf_counter() - start
+		samples = 0
+		epoch_rates = []
+		for _ in range(epochs):
+			epoch_start = time.perf_counter()
+			epoch_samples = 0
+			for index, batch in enumerate(loader):
+				if max_batches is not None and index >= max_batches:
+					break
+				if step is not None:
+					step(batch)
+				epoch_samples += len(batch[0])
+			epoch_rates.append(epoch_samples / (time.perf_counter() - epoch_start))
+			samples += epoch_samples
+		total = time.perf_counter() - start
+		results.append({
+			"name": name,
+			"config": repr(config),
+			"setup_seconds": round(setup, 3),
+			"samples": samples,
+			"samples_per_second": round(samples / total, 1),
+			"first_epoch_samples_per_second": round(epoch_rates[0], 1),
+			"steady_samples_per_second": round(epoch_rates[-1], 1),
+		})
+		logging.info(f"Loader benchmark: {results[-1]}")
+		del loader
+	return results
+
+
+def print_loader_report(results):
+	"""Print benchmark_loaders results with speed-up over the first configuration."""
+	baseline = results[0]["steady_samples_per_second"] if results else 1
+	print("Training input throughput (samples/sec, steady state / overall incl. setup):")
+	for result in results:
+		print(f"  {result['name']:<30} {result['steady_samples_per_second']:>12,.0f} {result['samples_per_second']:>12,.0f}"
+			  f"  x{result['steady_samples_per_second'] / baseline:5.1f}  setup {result['setup_seconds']:.2f}s")
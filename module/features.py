@@ -0,0 +1,216 @@
+import json
+import logging
+import os
+import shutil
+import time
+from collections import Counter
+
+import numpy as np
+
+from module.artifacts import load_csr, save_csr
+from module.lazy import lazy_import
+from module.preprocessing import (LABEL_COLUMN, RANDOM_STATE, TEST_SIZE, TEXT_COLUMN, get_text_preprocessor,
+								  handle_missing_values, iter_data)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+scipy_sparse = lazy_import("scipy.sparse", "sklearn_preprocessing")
+sklearn_text = lazy_import("sklearn.feature_extraction.text", "sklearn_preprocessing")
+sklearn_model_selection = lazy_import("sklearn.model_selection", "sklearn_preprocessing")
+
+# "hashing" needs one pass over the input and no vocabulary; "vocabulary" reads it twice to keep the max_features most frequent terms
+feature_mode = os.getenv('PI_FEATURE_MODE', 'hashing')
+feature_hash_bits = int(os.getenv('PI_FEATURE_HASH_BITS', '20'))
+feature_max_features = int(os.getenv('PI_FEATURE_MAX_FEATURES', '50000'))
+feature_chunk_rows = int(os.getenv('PI_FEATURE_CHUNK_ROWS', '100000'))
+feature_dir = os.getenv('PI_FEATURE_DIR', os.path.join('.cache', 'features'))
+streaming_features_enabled = os.getenv('PI_STREAMING_FEATURES', 'false').lower() in ('1', 'true', 'yes')
+
+MANIFEST = "manifest.json"
+
+
+def _tokens(tokens):
+	# Analyzer for documents that are already lemmatized token lists
+	return tokens
+
+
+class FeatureShards:
+	"""TF-IDF features written by StreamingFeatureExtractor, one CSR shard per input chunk.
+
+	Each shard directory holds data.npy, indices.npy, indptr.npy and labels.npy,
+	loaded with mmap_mode so a shard costs page cache rather than heap until its
+	values are touched. Labels keep the dtype they had in the input (strings are
+	stored as fixed-width unicode).
+	"""
+
+	def __init__(self, directory):
+		self.directory = directory
+		with open(os.path.join(directory, MANIFEST), 'r', encoding='utf-8') as file:
+			self.manifest = json.load(file)
+		self.n_features = self.manifest["n_features"]
+
+	def __len__(self):
+		return len(self.manifest["shards"])
+
+	def __iter__(self):
+		for index in range(len(self)):
+			yield self.shard(index)
+
+	@property
+	def rows(self):
+		return sum(shard["rows"] for shard in self.manifest["shards"])
+
+	def shard(self, index, mmap_mode='r'):
+		"""Return (X, labels) for one shard, backed by memory-mapped arrays."""
+		shard = self.manifest["shards"][index]
+		path = os.path.join(self.directory, shard["path"])
+		X = load_csr(path, (shard["rows"], self.n_features), mmap_mode)
+		return X, np.load(os.path.join(path, "labels.npy"))
+
+	def labels(self):
+		"""Return the labels of every shard in row order."""
+		parts = [np.load(os.path.join(self.directory, shard["path"], "labels.npy")) for shard in self.manifest["shards"]]
+		return np.concatenate(parts) if parts else np.array([], dtype=str)
+
+	def take(self, rows):
+		"""Return the given rows as one CSR matrix, copying only those rows out of the memory-mapped shards."""
+		rows = np.asarray(rows, dtype=np.int64)
+		order = np.argsort(rows, kind="stable")
+		ordered = rows[order]
+		offsets = np.cumsum([0] + [shard["rows"] for shard in self.manifest["shards"]])
+		bounds = np.searchsorted(ordered, offsets)
+		parts = [self.shard(index)[0][ordered[bounds[index]:bounds[index + 1]] - offsets[index]]
+				 for index in range(len(self)) if bounds[index] < bounds[index + 1]]
+		X = scipy_sparse.vstack(parts, format="csr") if parts else \
+			scipy_sparse.csr_matrix((0, self.n_features), dtype=np.float32)
+		# Rows were gathered shard by shard in ascending order; put them back in the order asked for
+		return X if np.array_equal(order, np.arange(len(rows))) else X[np.argsort(order)]
+
+	def split(self, y, test_size=TEST_SIZE, random_state=RANDOM_STATE):
+		"""Stratified train/test split of the shards' rows, as split_data but without stacking every shard first.
+
+		y holds one (encoded) label per row. Row indices are split, sorted, and
+		gathered shard by shard with take(), so only the two halves are ever
+		materialized. Returns (X_train, X_test, y_train, y_test).
+		"""
+		y = np.asarray(y)
+		train, test = sklearn_model_selection.train_test_split(np.arange(len(y)), test_size=test_size,
+															  random_state=random_state, stratify=y)
+		train, test = np.sort(train), np.sort(test)
+		return self.take(train), self.take(test), y[train], y[test]
+
+	def load(self):
+		"""Return (X, labels) for all shards stacked in memory."""
+		parts = list(self)
+		if not parts:
+			return scipy_sparse.csr_matrix((0, self.n_features), dtype=np.float32), np.array([], dtype=str)
+		return (scipy_sparse.vstack([X for X, _ in parts], format="csr"),
+				np.concatenate([labels for _, labels in parts]))
+
+
+class StreamingFeatureExtractor:
+	"""Turn a text/label export into TF-IDF shards on disk without holding it in memory.
+
+	The input is read chunk_rows rows at a time and lemmatized with the shared
+	TextPreprocessor. In "hashing" mode terms are hashed into 2**hash_bits
+	columns in the same pass; in "vocabulary" mode a first pass counts document
+	frequencies and keeps the max_features most common terms, and a second pass
+	vectorizes against them. Term counts are written as CSR shards and the IDF
+	weighting and L2 normalisation are then applied to each shard in place, so
+	the result matches sklearn's TfidfVectorizer defaults (smooth_idf, norm='l2')
+	for the same terms. Only one chunk and one document-frequency vector are in
+	memory at a time.
+	"""
+
+	def __init__(self, mode=feature_mode, hash_bits=feature_hash_bits, max_features=feature_max_features,
+				 chunk_rows=feature_chunk_rows, preprocessor=None):
+		if mode not in ("hashing", "vocabulary"):
+			raise ValueError(f"Unknown feature mode '{mode}'")
+		self.mode = mode
+		self.hash_bits = hash_bits
+		self.max_features = max_features
+		self.chunk_rows = chunk_rows
+		self.preprocessor = preprocessor or get_text_preprocessor()
+
+	def config(self):
+		"""Settings that determine the output, as recorded in the manifest."""
+		if self.mode == "hashing":
+			return {"mode": self.mode, "hash_bits": self.hash_bits}
+		return {"mode": self.mode, "max_features": self.max_features}
+
+	def extract(self, file_path, output_dir=feature_dir):
+		"""Write TF-IDF shards for file_path to output_dir, replacing its contents, and return FeatureShards."""
+		start = time.perf_counter()
+		vectorizer, vocabulary = self._vectorizer(file_path)
+		n_features = len(vocabulary) if vocabulary is not None else 2 ** self.hash_bits
+		if os.path.isdir(output_dir):
+			shutil.rmtree(output_dir)
+		os.makedirs(output_dir)
+
+		shards = []
+		document_frequency = np.zeros(n_features, dtype=np.int64)
+		for tokens, labels in self._chunks(file_path):
+			X = vectorizer.transform(tokens).astype(np.float32).tocsr()
+			X.sum_duplicates()
+			document_frequency += np.bincount(X.indices, minlength=n_features)
+			path = f"shard-{len(shards):05d}"
+			self._write_shard(os.path.join(output_dir, path), X, labels)
+			shards.append({"path": path, "rows": X.shape[0], "nnz": int(X.nnz)})
+
+		documents = sum(shard["rows"] for shard in shards)
+		idf = (np.log((1 + documents) / (1 + document_frequency)) + 1).astype(np.float32)
+		np.save(os.path.join(output_dir, "idf.npy"), idf)
+		for shard in shards:
+			self._apply_idf(os.path.join(output_dir, shard["path"]), idf)
+
+		manifest = {**self.config(), "n_features": n_features, "rows": documents, "shards": shards,
+					"source": os.path.abspath(file_path)}
+		if vocabulary is not None:
+			manifest["vocabulary"] = vocabulary
+		with open(os.path.join(output_dir, MANIFEST), 'w', encoding='utf-8') as file:
+			json.dump(manifest, file)
+		logging.info(f"Wrote {documents} rows of {n_features} features in {len(shards)} shard(s) "
+					 f"to {output_dir} in {time.perf_counter() - start:.2f}s")
+		return FeatureShards(output_dir)
+
+	def _chunks(self, file_path):
+		for chunk in iter_data(file_path, self.chunk_rows):
+			chunk = handle_missing_values(chunk)
+			if len(chunk):
+				tokens = self.preprocessor.transform(chunk[TEXT_COLUMN])["lemmatized_tokens"]
+				labels = chunk[LABEL_COLUMN].to_numpy()
+				# Object columns hold strings, which np.save can only store as unicode
+				yield tokens.tolist(), labels.astype(str) if labels.dtype == object else labels
+
+	def _vectorizer(self, file_path):
+		"""Return (vectorizer, vocabulary); vocabulary is the sorted term list, or None when hashing."""
+		if self.mode == "hashing":
+			return sklearn_text.HashingVectorizer(n_features=2 ** self.hash_bits, analyzer=_tokens,
+												  alternate_sign=False, norm=None, dtype=np.float32), None
+		counts = Counter()
+		for tokens, _ in self._chunks(file_path):
+			for document in tokens:
+				counts.update(set(document))
+		# Most frequent first, ties broken alphabetically so the vocabulary is reproducible
+		vocabulary = sorted(sorted(counts, key=lambda term: (-counts[term], term))[:self.max_features])
+		return sklearn_text.CountVectorizer(analyzer=_tokens, vocabulary=vocabulary, dtype=np.float32), vocabulary
+
+	@staticmethod
+	def _write_shard(path, X, labels):
+		save_csr(path, X)
+		np.save(os.path.join(path, "labels.npy"), labels)
+
+	@staticmethod
+	def _apply_idf(path, idf):
+		data = np.load(os.path.join(path, "data.npy"), mmap_mode='r+')
+		indices = np.load(os.path.join(path, "indices.npy"), mmap_mode='r')
+		indptr = np.load(os.path.join(path, "indptr.npy"))
+		if not len(data):
+			return
+		data *= idf[indices]
+		rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+		row_norms = np.sqrt(np.bincount(rows, weights=np.square(data, dtype=np.float64), minlength=len(indptr) - 1))
+		row_norms[row_norms == 0] = 1
+		data /= row_norms[rows].astype(data.dtype)
+		data.flush()
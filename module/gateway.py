@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import httpx
+
+from module.chat import create_async_http_client
+from module.ratelimit import QuotaExceeded, default_schedulers
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+WEATHER_URL = "http://api.openweathermap.org/data/2.5/weather"
+NEWS_URL = "https://newsapi.org/v2/top-headlines"
+STOCK_URL = "https://www.alphavantage.co/query"
+
+# Seconds a cached answer is fresh, then how much longer it may be served while revalidating
+DEFAULT_TTL = {"weather": 600, "news": 300, "stock": 60}
+DEFAULT_STALE_TTL = {"weather": 1800, "news": 900, "stock": 120}
+FAILURE_MESSAGES = {
+	"weather": "Failed to fetch weather.",
+	"news": "Failed to fetch news.",
+	"stock": "Failed to fetch stock price.",
+}
+LOCATION_NOT_FOUND = "Location not found."
+TRY_LATER_MESSAGES = {
+	"news": "The news service is busy right now; please try again in {seconds} seconds.",
+	"stock": "The stock price service is busy right now; please try again in {seconds} seconds.",
+}
+
+
+class ProviderError(Exception):
+	"""Raised when a provider answers with an error payload instead of data."""
+
+
+def format_weather(location, data):
+	"""Turn an OpenWeatherMap response into the bot's weather sentence."""
+	if str(data.get("cod")) == "404":
+		return LOCATION_NOT_FOUND
+	if "main" not in data:
+		raise ProviderError(f"OpenWeatherMap error: {data.get('message', data)}")
+	temperature = data["main"]["temp"]
+	description = data["weather"][0]["description"]
+	return f"The weather in {location} is currently {description} with a temperature of {temperature}°K."
+
+
+def format_news(data):
+	"""Turn a NewsAPI top-headlines response into the bot's headline list."""
+	if data.get("status") != "ok":
+		raise ProviderError(f"NewsAPI error: {data.get('code')}: {data.get('message')}")
+	headlines = [article["title"] for article in data["articles"][:5]]
+	return "Here are the latest news headlines:\n" + "\n".join(headlines)
+
+
+def format_stock_price(symbol, interval, data):
+	"""Turn an Alpha Vantage intraday response into the bot's price sentence."""
+	# Throttling and key problems come back as HTTP 200 with a Note, Information or Error Message field
+	for field in ("Error Message", "Note", "Information"):
+		if field in data:
+			raise ProviderError(f"Alpha Vantage {field.lower()}: {data[field]}")
+	series = data.get(f"Time Series ({interval})")
+	if not series:
+		raise ProviderError(f"Alpha Vantage returned no {interval} series for {symbol}")
+	latest_time = next(iter(series))
+	latest_close = series[latest_time]["4. close"]
+	return f"The latest closing price of {symbol} is ${latest_close}."
+
+
+class ExternalDataGateway:
+	"""Async, cached access to the weather, news and stock APIs.
+
+	Answers are cached per endpoint and key (location, country, symbol plus
+	interval). A fresh entry is returned directly; an entry within its stale
+	window is returned immediately while one background request refreshes it.
+	Concurrent misses for the same key share a single upstream request. Only
+	successful answers are cached: HTTP errors and provider error payloads raise,
+	and then the last known answer is served when there is one.
+
+	Quota-limited endpoints go through a ProviderScheduler first. Background
+	revalidation only runs when a token is free; when a user's call cannot be
+	admitted in time the last known answer (however old) or a "try later"
+	message is returned instead.
+
+	All lookups run on an event loop owned by the gateway, in a thread of its
+	own, so the cache, the schedulers and the HTTP client are shared by every
+	caller: coroutines await get_weather() and friends, while synchronous code
+	such as the function-calling worker threads calls get_weather_sync() and
+	friends, which block until the answer is ready.
+	"""
+
+	def __init__(self, ttl=None, stale_ttl=None, max_entries=2048, schedulers=None):
+		self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+		self.stale_ttl = {**DEFAULT_STALE_TTL, **(stale_ttl or {})}
+		self.max_entries = max_entries
+		self._cache = OrderedDict()
+		self._inflight = {}
+		self._background = set()
+		self.schedulers = default_schedulers() if schedulers is None else schedulers
+		self._loop = None
+		self._loop_lock = threading.Lock()
+		self._client = None
+		self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "upstream_calls": 0, "errors": 0,
+					   "rate_limited": 0}
+
+	async def get_weather(self, location):
+		return await asyncio.wrap_future(self._submit(self._lookup_weather(location)))
+
+	async def get_latest_news(self, country="us"):
+		return await asyncio.wrap_future(self._submit(self._lookup_news(country)))
+
+	async def get_stock_price(self, symbol, interval="5min"):
+		return await asyncio.wrap_future(self._submit(self._lookup_stock_price(symbol, interval)))
+
+	def get_weather_sync(self, location):
+		return self._submit(self._lookup_weather(location)).result()
+
+	def get_latest_news_sync(self, country="us"):
+		return self._submit(self._lookup_news(country)).result()
+
+	def get_stock_price_sync(self, symbol, interval="5min"):
+		return self._submit(self._lookup_stock_price(symbol, interval)).result()
+
+	def stats(self):
+		return {**self._stats, "entries": len(self._cache), "inflight": len(self._inflight), "quota": self.quota_metrics()}
+
+	def quota_metrics(self):
+		"""Return {provider: quota metrics} for every rate-limited endpoint."""
+		return {scheduler.name: scheduler.metrics() for scheduler in self.schedulers.values()}
+
+	def invalidate(self, endpoint=None):
+		"""Drop cached answers, for one endpoint or all of them."""
+		for cache_key in [k for k in self._cache if endpoint is None or k[0] == endpoint]:
+			del self._cache[cache_key]
+
+	def _submit(self, coroutine):
+		"""Schedule coroutine on the gateway's loop and return a concurrent.futures.Future for its result."""
+		if self._loop is None:
+			with self._loop_lock:
+				if self._loop is None:
+					loop = asyncio.new_event_loop()
+					threading.Thread(target=loop.run_forever, name="external-data-gateway", daemon=True).start()
+					self._loop = loop
+		return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+	async def _lookup_weather(self, location):
+		key = location.strip().lower()
+		return await self._get("weather", key, lambda: self._fetch_weather(location))
+
+	async def _lookup_news(self, country):
+		key = country.strip().lower()
+		return await self._get("news", key, lambda: self._fetch_news(key))
+
+	async def _lookup_stock_price(self, symbol, interval):
+		symbol = symbol.strip().upper()
+		return await self._get("stock", (symbol, interval), lambda: self._fetch_stock_price(symbol, interval))
+
+	async def _get(self, endpoint, key, fetch):
+		cache_key = (endpoint, key)
+		entry = self._cache.get(cache_key)
+		if entry is not None:
+			age = time.monotonic() - entry[1]
+			if age < self.ttl[endpoint]:
+				self._stats["hits"] += 1
+				return entry[0]
+			if age < self.ttl[endpoint] + self.stale_ttl[endpoint]:
+				self._stats["stale_hits"] += 1
+				if cache_key not in self._inflight:
+					task = asyncio.ensure_future(self._fetch_once(cache_key, fetch, background=True))
+					self._background.add(task)
+					task.add_done_callback(self._background.discard)
+				return entry[0]
+		self._stats["misses"] += 1
+		return await self._fetch_once(cache_key, fetch)
+
+	async def _fetch_once(self, cache_key, fetch, background=False):
+		task = self._inflight.get(cache_key)
+		if task is None:
+			task = asyncio.ensure_future(self._fetch_and_store(cache_key, fetch, background))
+			self._inflight[cache_key] = task
+			task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+		else:
+			self._stats["coalesced"] += 1
+		return await asyncio.shield(task)
+
+	async def _fetch_and_store(self, cache_key, fetch, background=False):
+		scheduler = self.schedulers.get(cache_key[0])
+		try:
+			if scheduler is not None:
+				# Refreshes never queue behind users; they wait for a spare token
+				await scheduler.acquire(priority=1 if background else 0, max_wait=0 if background else None)
+			self._stats["upstream_calls"] += 1
+			value = await fetch()
+		except QuotaExceeded as e:
+			self._stats["rate_limited"] += 1
+			logging.warning(f"Skipping {cache_key[0]} lookup for {cache_key[1]}: {e}")
+			entry = self._cache.get(cache_key)
+			return entry[0] if entry is not None else TRY_LATER_MESSAGES[cache_key[0]].format(seconds=int(e.retry_after) + 1)
+		except (httpx.HTTPError, ProviderError, ValueError, KeyError) as e:
+			self._stats["errors"] += 1
+			logging.error(f"Error fetching {cache_key[0]} data for {cache_key[1]}: {e}")
+			entry = self._cache.get(cache_key)
+			return entry[0] if entry is not None else FAILURE_MESSAGES[cache_key[0]]
+		self._cache[cache_key] = (value, time.monotonic())
+		self._cache.move_to_end(cache_key)
+		if len(self._cache) > self.max_entries:
+			self._cache.popitem(last=False)
+		return value
+
+	def _http_client(self):
+		# Runs on the gateway's loop, which the client's connections are bound to
+		if self._client is None or self._client.is_closed:
+			self._client = create_async_http_client()
+		return self._client
+
+	async def _fetch_weather(self, location):
+		params = {"q": location, "appid": os.getenv('WEATHER_API_KEY')}
+		response = await self._http_client().get(WEATHER_URL, params=params)
+		if response.status_code == 404:
+			return LOCATION_NOT_FOUND
+		response.raise_for_status()
+		return format_weather(location, response.json())
+
+	async def _fetch_news(self, country):
+		params = {"country": country, "apiKey": os.getenv('NEWS_API_KEY')}
+		response = await self._http_client().get(NEWS_URL, params=params)
+		response.raise_for_status()
+		return format_news(response.json())
+
+	async def _fetch_stock_price(self, symbol, interval):
+		params = {
+			"function": "TIME_SERIES_INTRADAY",
+			"symbol": symbol,
+			"interval": interval,
+			"apikey": os.getenv('ALPHA_VANTAGE_API_KEY'),
+		}
+		response = await self._http_client().get(STOCK_URL, params=params)
+		response.raise_for_status()
+		return format_stock_price(symbol, interval, response.json())
+
+
+_gateway = None
+
+
+def get_gateway():
+	"""Return the process-wide ExternalDataGateway."""
+	global _gateway
+	if _gateway is None:
+		_gateway = ExternalDataGateway()
+	return _gateway
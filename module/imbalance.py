@@ -0,0 +1,217 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from module.lazy import lazy_import
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+scipy_sparse = lazy_import("scipy.sparse", "sklearn_preprocessing")
+sklearn_decomposition = lazy_import("sklearn.decomposition", "sklearn_preprocessing")
+sklearn_neighbors = lazy_import("sklearn.neighbors", "sklearn_preprocessing")
+imblearn_over_sampling = lazy_import("imblearn.over_sampling", "sklearn_preprocessing")
+
+imbalance_strategy = os.getenv('PI_IMBALANCE_STRATEGY', 'ann_smote')
+# Dimensions of the embedding approximate-NN SMOTE searches for neighbours in
+smote_embedding_dim = int(os.getenv('PI_SMOTE_EMBEDDING_DIM', '64'))
+smote_neighbors = int(os.getenv('PI_SMOTE_NEIGHBORS', '5'))
+
+
+def class_weights(y):
+	"""Return {class: weight} inversely proportional to class frequency, as sklearn's class_weight='balanced'."""
+	classes, counts = np.unique(y, return_counts=True)
+	weights = len(y) / (len(classes) * counts)
+	return dict(zip(classes.tolist(), weights.tolist()))
+
+
+def sample_weights(y):
+	"""Per-row weights that balance the classes, for estimators that take sample_weight."""
+	classes, inverse, counts = np.unique(y, return_inverse=True, return_counts=True)
+	return (len(y) / (len(classes) * counts))[inverse]
+
+
+def _take_rows(X, y, rows):
+	return X[rows], np.asarray(y)[rows]
+
+
+def random_over_sample(X, y, random_state=42):
+	"""Duplicate random rows of every smaller class until each matches the largest; X may be sparse."""
+	rng = np.random.default_rng(random_state)
+	y = np.asarray(y)
+	classes, counts = np.unique(y, return_counts=True)
+	extra = [rng.choice(np.flatnonzero(y == label), counts.max() - count)
+			 for label, count in zip(classes, counts) if count < counts.max()]
+	rows = np.concatenate([np.arange(len(y))] + extra)
+	return _take_rows(X, y, rows)
+
+
+def random_under_sample(X, y, random_state=42):
+	"""Keep a random subset of every larger class so each matches the smallest; X may be sparse."""
+	rng = np.random.default_rng(random_state)
+	y = np.asarray(y)
+	classes, counts = np.unique(y, return_counts=True)
+	rows = np.sort(np.concatenate([rng.choice(np.flatnonzero(y == label), counts.min(), replace=False)
+								   for label in classes]))
+	return _take_rows(X, y, rows)
+
+
+def ann_smote(X, y, k_neighbors=smote_neighbors, embedding_dim=smote_embedding_dim, random_state=42):
+	"""SMOTE with neighbours found in a low-dimensional embedding instead of the raw feature space.
+
+	The rows of each class being oversampled are projected to embedding_dim
+	dimensions with TruncatedSVD, which works on sparse input without densifying
+	it, and each row's k nearest same-class neighbours are found there; the
+	majority class is never embedded. Synthetic rows are interpolated
+	between a row and one of its neighbours in the original space, so sparse X
+	stays sparse and the output keeps its columns.
+	"""
+	rng = np.random.default_rng(random_state)
+	y = np.asarray(y)
+	classes, counts = np.unique(y, return_counts=True)
+
+	new_X, new_y = [X], [y]
+	for label, count in zip(classes, counts):
+		needed = counts.max() - count
+		members = np.flatnonzero(y == label)
+		if needed == 0:
+			continue
+		components = min(embedding_dim, len(members) - 1, X.shape[1] - 1)
+		if components < 1:
+			# No neighbour to interpolate towards; fall back to duplicating rows
+			new_X.append(X[rng.choice(members, needed)])
+			new_y.append(np.full(needed, label, dtype=y.dtype))
+			continue
+		svd = sklearn_decomposition.TruncatedSVD(n_components=components, random_state=random_state)
+		embedding = svd.fit_transform(X[members])
+		embedding /= np.maximum(np.linalg.norm(embedding, axis=1, keepdims=True), 1e-12)
+		k = min(k_neighbors, len(members) - 1)
+		_, nearest = sklearn_neighbors.NearestNeighbors(n_neighbors=k + 1).fit(embedding).kneighbors(embedding)
+		base = rng.integers(0, len(members), needed)
+		partner = nearest[base, rng.integers(1, k + 1, needed)]
+		gap = rng.random(needed).astype(np.float32)
+		start, end = X[members[base]], X[members[partner]]
+		if scipy_sparse.issparse(X):
+			new_X.append(scipy_sparse.diags(1 - gap) @ start + scipy_sparse.diags(gap) @ end)
+		else:
+			new_X.append(start + gap[:, None] * (end - start))
+		new_y.append(np.full(needed, label, dtype=y.dtype))
+	if scipy_sparse.issparse(X):
+		return scipy_sparse.vstack(new_X, format="csr", dtype=X.dtype), np.concatenate(new_y)
+	return np.vstack(new_X), np.concatenate(new_y)
+
+
+def smote(X, y, random_state=42):
+	"""imblearn's exact SMOTE, kept for comparison; its neighbour search is slow on wide sparse input."""
+	return imblearn_over_sampling.SMOTE(random_state=random_state).fit_resample(X, y)
+
+
+def class_weighted(X, y, random_state=42):
+	"""Leave the data as it is; pair with class_weights()/sample_weights() when training."""
+	return X, np.asarray(y)
+
+
+STRATEGIES = {
+	"class_weight": class_weighted,
+	"random_over": random_over_sample,
+	"random_under": random_under_sample,
+	"ann_smote": ann_smote,
+	"smote": smote,
+}
+
+
+def imbalance_config(strategy=imbalance_strategy):
+	"""Settings that change what resample() produces for strategy."""
+	config = {"strategy": strategy}
+	if strategy == "ann_smote":
+		config.update(neighbors=smote_neighbors, embedding_dim=smote_embedding_dim)
+	return config
+
+
+def resample(X, y, strategy=imbalance_strategy, random_state=42):
+	"""Rebalance (X, y) with one of STRATEGIES and return the new (X, y)."""
+	if strategy not in STRATEGIES:
+		raise ValueError(f"Unknown imbalance strategy '{strategy}'; expected one of {', '.join(STRATEGIES)}")
+	return STRATEGIES[strategy](X, y, random_state=random_state)
+
+
+def make_imbalanced_text_features(rows, n_features=50000, density=0.001, minority_fraction=0.05, random_state=0):
+	"""Random sparse TF-IDF-like features with a binary label where minority_fraction of rows are class 1."""
+	rng = np.random.default_rng(random_state)
+	X = scipy_sparse.random(rows, n_features, density=density, format="csr", dtype=np.float32, random_state=rng)
+	y = (rng.random(rows) < minority_fraction).astype(np.int64)
+	# Give the minority class a few telltale columns so neighbours are meaningful
+	minority = np.repeat(np.flatnonzero(y == 1), 10)
+	columns = np.tile(np.arange(10), int(y.sum()))
+	signal = scipy_sparse.csr_matrix((rng.random(len(minority)).astype(np.float32), (minority, columns)),
+									 shape=X.shape)
+	return (X + signal).tocsr(), y
+
+
+def _peak_rss_mb():
+	try:
+		import resource
+	except ImportError:
+		return None
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# Linux reports kilobytes, macOS bytes
+	return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def _benchmark_run(strategy, rows, n_features, density, minority_fraction):
+	X, y = make_imbalanced_text_features(rows, n_features, density, minority_fraction)
+	try:
+		# Warm up on a small slice so library imports are not counted against the strategy
+		resample(X[:1000], y[:1000], strategy)
+		before = _peak_rss_mb()
+		start = time.perf_counter()
+		X_out, y_out = resample(X, y, strategy)
+	except Exception as e:
+		return {"strategy": strategy, "rows": rows, "error": str(e)}
+	seconds = time.perf_counter() - start
+	after = _peak_rss_mb()
+	return {
+		"strategy": strategy,
+		"rows": rows,
+		"seconds": round(seconds, 4),
+		"peak_rss_mb": round(after, 1) if after is not None else None,
+		"extra_rss_mb": round(after - before, 1) if after is not None else None,
+		"output_rows": X_out.shape[0],
+		"output_nnz": int(X_out.nnz) if scipy_sparse.issparse(X_out) else int(np.count_nonzero(X_out)),
+	}
+
+
+def benchmark_imbalance(sizes=(10000, 50000, 200000), strategies=None, n_features=50000, density=0.001,
+						minority_fraction=0.05):
+	"""Time each strategy on synthetic sparse data of each size and record its peak RSS.
+
+	Every run happens in a fresh process, so peak RSS belongs to that run alone;
+	extra_rss_mb is the growth over the process's peak once the data was built.
+	"""
+	results = []
+	for rows in sizes:
+		for strategy in strategies or list(STRATEGIES):
+			with ProcessPoolExecutor(max_workers=1) as executor:
+				result = executor.submit(_benchmark_run, strategy, rows, n_features, density, minority_fraction).result()
+			results.append(result)
+			logging.info(f"Imbalance benchmark: {result}")
+	return results
+
+
+def print_imbalance_report(results):
+	"""Print benchmark_imbalance results, one line per strategy and size."""
+	print("Imbalance strategies (wall time, peak RSS, growth over input):")
+	for result in results:
+		if "error" in result:
+			print(f"  {result['strategy']:<13} {result['rows']:>9} rows  unavailable ({result['error']})")
+			continue
+		rss = f"{result['peak_rss_mb']:8.1f} MB {result['extra_rss_mb']:+8.1f} MB" if result["peak_rss_mb"] is not None else "n/a"
+		print(f"  {result['strategy']:<13} {result['rows']:>9} rows  {result['seconds']:8.3f} s  {rss}  "
+			  f"-> {result['output_rows']} rows")
+
+
+if __name__ == "__main__":
+	print_imbalance_report(benchmark_imbalance())
@@ -0,0 +1,144 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import torch
+from transformers import BertForSequenceClassification, BertTokenizer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+bert_model_name = os.getenv('PI_BERT_MODEL', 'bert-base-uncased')
+bert_num_threads = int(os.getenv('PI_TORCH_THREADS', '0'))
+bert_max_batch_size = int(os.getenv('PI_BERT_MAX_BATCH_SIZE', '32'))
+bert_max_wait_ms = float(os.getenv('PI_BERT_MAX_WAIT_MS', '5'))
+bert_max_length = int(os.getenv('PI_BERT_MAX_LENGTH', '256'))
+
+
+class BertInferenceEngine:
+	"""CPU inference engine that loads BERT once and serves batched requests.
+
+	embed() and classify() tokenize all texts, sort them by token length and run
+	them in batches of at most max_batch_size so each batch pads only to its own
+	longest text. submit() queues single texts for a background worker that
+	groups whatever arrives within max_wait_ms into one micro-batch.
+	"""
+
+	def __init__(self, model_name=bert_model_name, num_labels=3, max_batch_size=bert_max_batch_size,
+				 max_wait_ms=bert_max_wait_ms, num_threads=bert_num_threads, max_length=bert_max_length):
+		self.model_name = model_name
+		self.num_labels = num_labels
+		self.max_batch_size = max_batch_size
+		self.max_wait = max_wait_ms / 1000.0
+		self.num_threads = num_threads
+		self.max_length = max_length
+		self.tokenizer = None
+		self.model = None
+		self._load_lock = threading.Lock()
+		self._requests = queue.Queue()
+		self._worker = None
+
+	def load(self):
+		"""Load the tokenizer and model once; later calls are no-ops."""
+		if self.model is None:
+			with self._load_lock:
+				if self.model is None:
+					if self.num_threads:
+						torch.set_num_threads(self.num_threads)
+					logging.info(f"Loading BERT model '{self.model_name}'...")
+					self.tokenizer = BertTokenizer.from_pretrained(self.model_name)
+					model = BertForSequenceClassification.from_pretrained(self.model_name, num_labels=self.num_labels)
+					model.eval()
+					self.model = model
+		return self
+
+	def embed(self, texts):
+		"""Return mean-pooled last-layer embeddings, one row per text."""
+		return self._run(texts)[0]
+
+	def classify(self, texts):
+		"""Return pipeline-style [{'label', 'score'}] predictions, one per text."""
+		id2label = self.load().model.config.id2label
+		scores, labels = torch.softmax(self._run(texts)[1], dim=-1).max(dim=-1)
+		return [{"label": id2label[int(label)], "score": float(score)} for score, label in zip(scores, labels)]
+
+	def submit(self, text, task="embed"):
+		"""Queue one text for dynamic micro-batching and return a concurrent.futures.Future."""
+		if task not in ("embed", "classify"):
+			raise ValueError(f"Unknown BERT task '{task}'")
+		future = Future()
+		self._ensure_worker()
+		self._requests.put((task, text, future))
+		return future
+
+	def _run(self, texts):
+		"""Return (embeddings, logits) for texts, computed in length-sorted buckets."""
+		self.load()
+		texts = list(texts)
+		if not texts:
+			config = self.model.config
+			return torch.empty(0, config.hidden_size), torch.empty(0, config.num_labels)
+		encoded = self.tokenizer(texts, truncation=True, max_length=self.max_length)["input_ids"]
+		order = sorted(range(len(encoded)), key=lambda i: len(encoded[i]))
+		embeddings = [None] * len(encoded)
+		logits = [None] * len(encoded)
+		with torch.inference_mode():
+			for start in range(0, len(order), self.max_batch_size):
+				bucket = order[start:start + self.max_batch_size]
+				batch = self.tokenizer.pad({"input_ids": [encoded[i] for i in bucket]}, return_tensors='pt')
+				outputs = self.model(**batch, output_hidden_states=True)
+				mask = batch["attention_mask"].unsqueeze(-1).to(outputs.hidden_states[-1].dtype)
+				pooled = (outputs.hidden_states[-1] * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+				for row, i in enumerate(bucket):
+					embeddings[i] = pooled[row]
+					logits[i] = outputs.logits[row]
+		return torch.stack(embeddings), torch.stack(logits)
+
+	def _ensure_worker(self):
+		if self._worker is None or not self._worker.is_alive():
+			with self._load_lock:
+				if self._worker is None or not self._worker.is_alive():
+					self._worker = threading.Thread(target=self._serve, name="bert-inference", daemon=True)
+					self._worker.start()
+
+	def _serve(self):
+		while True:
+			pending = [self._requests.get()]
+			deadline = time.monotonic() + self.max_wait
+			try:
+				while len(pending) < self.max_batch_size:
+					pending.append(self._requests.get(timeout=max(0.0, deadline - time.monotonic())))
+			except queue.Empty:
+				pass
+			for task in ("embed", "classify"):
+				# Futures cancelled while queued are dropped; the rest can no longer be cancelled
+				group = [(text, future) for kind, text, future in pending
+						 if kind == task and future.set_running_or_notify_cancel()]
+				if not group:
+					continue
+				try:
+					results = self.embed([text for text, _ in group]) if task == "embed" else \
+						self.classify([text for text, _ in group])
+					for (_, future), result in zip(group, results):
+						future.set_result(result)
+				except Exception as e:
+					logging.error(f"Error running BERT {task} batch: {e}")
+					for _, future in group:
+						future.set_exception(e)
+
+
+_bert_engine = None
+_bert_engine_lock = threading.Lock()
+
+
+def get_bert_engine():
+	"""Return the shared BertInferenceEngine for this process."""
+	global _bert_engine
+	if _bert_engine is None:
+		with _bert_engine_lock:
+			if _bert_engine is None:
+				_bert_engine = BertInferenceEngine()
+	return _bert_engine
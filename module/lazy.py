@@ -0,0 +1,111 @@
+import importlib
+import json
+import logging
+import subprocess
+import sys
+import threading
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Integration name -> modules it pulls in, as registered by lazy_import()
+INTEGRATIONS = {}
+_import_seconds = {}
+_lock = threading.RLock()
+
+
+class LazyModule:
+	"""Stand-in for a module that is imported on first attribute access.
+
+	on_load, if given, is called with the real module once it has been imported,
+	e.g. to configure an API key.
+	"""
+
+	def __init__(self, name, integration, on_load=None):
+		self.__dict__["_name"] = name
+		self.__dict__["_integration"] = integration
+		self.__dict__["_on_load"] = on_load
+		self.__dict__["_module"] = None
+
+	def _load(self):
+		module = self.__dict__["_module"]
+		if module is None:
+			with _lock:
+				module = self.__dict__["_module"]
+				if module is None:
+					start = time.perf_counter()
+					module = importlib.import_module(self._name)
+					_import_seconds[self._name] = time.perf_counter() - start
+					logging.debug(f"Imported {self._name} for '{self._integration}' in {_import_seconds[self._name]:.3f}s")
+					if self._on_load is not None:
+						self._on_load(module)
+					self.__dict__["_module"] = module
+		return module
+
+	def __getattr__(self, attr):
+		return getattr(self._load(), attr)
+
+	def __setattr__(self, attr, value):
+		setattr(self._load(), attr, value)
+
+	def __repr__(self):
+		state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+		return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name, integration, on_load=None):
+	"""Return a LazyModule for name and register it under integration for profiling."""
+	with _lock:
+		modules = INTEGRATIONS.setdefault(integration, [])
+		if name not in modules:
+			modules.append(name)
+	return LazyModule(name, integration, on_load)
+
+
+def import_profile():
+	"""Report which integrations this process has imported so far and what they cost."""
+	with _lock:
+		return {
+			integration: {
+				"modules": list(modules),
+				"loaded": all(name in _import_seconds for name in modules),
+				"seconds": sum(_import_seconds.get(name, 0.0) for name in modules),
+			}
+			for integration, modules in INTEGRATIONS.items()
+		}
+
+
+def measure_import_costs(integrations=None):
+	"""Import each integration in a fresh interpreter and return its cold-start cost in seconds.
+
+	Integrations whose modules are not installed are reported with an "error" entry.
+	"""
+	script = (
+		"import importlib, json, sys, time\n"
+		"start = time.perf_counter()\n"
+		"for name in sys.argv[1:]:\n"
+		"    importlib.import_module(name)\n"
+		"print(json.dumps(time.perf_counter() - start))\n"
+	)
+	report = {}
+	for integration, modules in (integrations or INTEGRATIONS).items():
+		result = subprocess.run([sys.executable, "-c", script, *modules], capture_output=True, text=True)
+		if result.returncode == 0:
+			report[integration] = {"modules": list(modules), "seconds": json.loads(result.stdout)}
+		else:
+			report[integration] = {"modules": list(modules), "error": result.stderr.strip().splitlines()[-1]}
+	return report
+
+
+def print_import_report(report):
+	"""Print an import-cost report, most expensive integration first."""
+	def cost(item):
+		return item[1].get("seconds", -1.0)
+
+	print("Integration import costs:")
+	for integration, entry in sorted(report.items(), key=cost, reverse=True):
+		if "error" in entry:
+			print(f"  {integration:<24} unavailable ({entry['error']})")
+		else:
+			print(f"  {integration:<24} {entry['seconds'] * 1000:8.1f} ms  {', '.join(entry['modules'])}")
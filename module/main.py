@@ -1,15 +1,25 @@
+import sys
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import DataLoader
 from torchvision import datasets, transforms
 
-# Load and preprocess data
-def load_data(batch_size):
+try:
+    from module.dataloading import (LoaderConfig, benchmark_loaders, make_loader, print_loader_report,
+                                    scaled_learning_rate, train_batch_size)
+except ImportError:
+    from dataloading import (LoaderConfig, benchmark_loaders, make_loader, print_loader_report,
+                             scaled_learning_rate, train_batch_size)
+
+def load_mnist():
     transform = transforms.Compose([transforms.ToTensor(), transforms.Normalize((0.5,), (0.5,))])
-    train_set = datasets.MNIST('.', download=True, train=True, transform=transform)
-    train_loader = DataLoader(train_set, batch_size=batch_size, shuffle=True)
-    return train_loader
+    return datasets.MNIST('.', download=True, train=True, transform=transform)
+
+# Load and preprocess data; MNIST fits in memory and its transform has no randomness,
+# so by default it is decoded once and served as tensor slices
+def load_data(batch_size, config=None):
+    config = LoaderConfig(batch_size=batch_size, preload=True) if config is None else config
+    return make_loader(load_mnist(), config)
 
 # Define the model
 class SimpleNN(nn.Module):
@@ -44,10 +54,35 @@ def train_model(model, train_loader, epochs, learning_rate):
 def save_model(model, filepath):
     torch.save(model.state_dict(), filepath)
 
+# Compare input pipeline configurations on CPU, loading alone and with a training step per batch
+def benchmark_input_pipeline(epochs=2):
+    train_set = load_mnist()
+    model = SimpleNN()
+    optimizer = optim.Adam(model.parameters(), lr=0.001)
+    loss_fn = nn.NLLLoss()
+
+    def train_step(batch):
+        data, target = batch
+        optimizer.zero_grad()
+        loss_fn(model(data), target).backward()
+        optimizer.step()
+
+    print("Loading only:")
+    loading = benchmark_loaders(train_set, epochs=epochs)
+    print_loader_report(loading)
+    print("Loading and training:")
+    training = benchmark_loaders(train_set, epochs=epochs, step=train_step)
+    print_loader_report(training)
+    return {"loading": loading, "training": training}
+
 if __name__ == "__main__":
-    batch_size = 32
+    if "--benchmark" in sys.argv:
+        benchmark_input_pipeline()
+        sys.exit(0)
+    batch_size = train_batch_size
     epochs = 5
-    learning_rate = 0.001
+    # 0.001 was tuned for batches of 32
+    learning_rate = scaled_learning_rate(0.001, batch_size)
     train_loader = load_data(batch_size)
     model = SimpleNN()
     train_model(model, train_loader, epochs, learning_rate)
@@ -0,0 +1,164 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def entry_size(entry):
+	"""Approximate the resident size of a context entry in bytes."""
+	return len(json.dumps(entry, default=str).encode('utf-8'))
+
+
+class _UserHistory:
+	"""Ring buffer of one user's turns plus the running summary of older turns."""
+
+	def __init__(self, max_turns):
+		self.turns = deque()
+		self.sizes = deque()
+		self.max_turns = max_turns
+		self.summary = None
+		self.pending = []
+		self.bytes = 0
+		self.last_seen = time.monotonic()
+
+
+class ConversationStore:
+	"""Bounded per-user conversation memory with LRU eviction of idle users.
+
+	Each user keeps at most max_turns_per_user entries. When the combined size of
+	all users exceeds max_total_bytes, the least recently active users are evicted
+	first; users idle for longer than idle_seconds are dropped on the next write.
+	If a summarizer is given, turns that fall off a user's ring buffer are passed
+	to it in batches of summarize_batch as summarizer(turns, previous_summary) and
+	the returned string is kept as the first entry of that user's history.
+	on_evict(user_id), if given, is called whenever a user is evicted.
+	"""
+
+	def __init__(self, max_turns_per_user=50, max_total_bytes=32 * 1024 * 1024, idle_seconds=3600,
+				 summarizer=None, summarize_batch=10, on_evict=None):
+		self.max_turns_per_user = max_turns_per_user
+		self.max_total_bytes = max_total_bytes
+		self.idle_seconds = idle_seconds
+		self.summarizer = summarizer
+		self.summarize_batch = summarize_batch
+		self.on_evict = on_evict
+		self._users = OrderedDict()
+		self._lock = threading.RLock()
+		self._bytes = 0
+		self._evicted_users = 0
+		self._dropped_turns = 0
+		self._summarized_turns = 0
+
+	def __contains__(self, user_id):
+		with self._lock:
+			return user_id in self._users
+
+	def __getitem__(self, user_id):
+		return self.history(user_id)
+
+	def __len__(self):
+		with self._lock:
+			return len(self._users)
+
+	def append(self, user_id, entry):
+		"""Record an entry for user_id, evicting old turns and idle users as needed."""
+		size = entry_size(entry)
+		with self._lock:
+			user = self._touch(user_id)
+			if len(user.turns) >= user.max_turns:
+				self._drop_oldest(user)
+			user.turns.append(entry)
+			user.sizes.append(size)
+			user.bytes += size
+			self._bytes += size
+			self._enforce_limits(user_id)
+
+	def history(self, user_id):
+		"""Return the user's summary (if any) followed by their resident turns."""
+		with self._lock:
+			user = self._users.get(user_id)
+			if user is None:
+				return []
+			self._users.move_to_end(user_id)
+			user.last_seen = time.monotonic()
+			entries = list(user.turns)
+			if user.summary:
+				entries.insert(0, {"summary": user.summary})
+			return entries
+
+	def pop(self, user_id, default=None):
+		"""Forget everything stored for user_id."""
+		with self._lock:
+			user = self._users.pop(user_id, None)
+			if user is None:
+				return default
+			self._bytes -= user.bytes
+			return list(user.turns)
+
+	def stats(self):
+		"""Return counters describing the resident memory of the store."""
+		with self._lock:
+			return {
+				"resident_users": len(self._users),
+				"resident_turns": sum(len(user.turns) for user in self._users.values()),
+				"resident_bytes": self._bytes,
+				"max_total_bytes": self.max_total_bytes,
+				"evicted_users": self._evicted_users,
+				"dropped_turns": self._dropped_turns,
+				"summarized_turns": self._summarized_turns,
+			}
+
+	def _touch(self, user_id):
+		user = self._users.get(user_id)
+		if user is None:
+			user = _UserHistory(self.max_turns_per_user)
+			self._users[user_id] = user
+		else:
+			self._users.move_to_end(user_id)
+		user.last_seen = time.monotonic()
+		return user
+
+	def _drop_oldest(self, user):
+		entry = user.turns.popleft()
+		size = user.sizes.popleft()
+		user.bytes -= size
+		self._bytes -= size
+		self._dropped_turns += 1
+		if self.summarizer is None:
+			return
+		user.pending.append(entry)
+		if len(user.pending) >= self.summarize_batch:
+			try:
+				summary = self.summarizer(user.pending, user.summary)
+				delta = entry_size(summary) - (entry_size(user.summary) if user.summary else 0)
+				user.summary = summary
+				user.bytes += delta
+				self._bytes += delta
+				self._summarized_turns += len(user.pending)
+			except Exception as e:
+				logging.error(f"Error summarizing conversation turns: {e}")
+			user.pending = []
+
+	def _evict(self, user_id):
+		user = self._users.pop(user_id)
+		self._bytes -= user.bytes
+		self._evicted_users += 1
+		if self.on_evict is not None:
+			self.on_evict(user_id)
+
+	def _enforce_limits(self, active_user_id):
+		if self.idle_seconds is not None:
+			cutoff = time.monotonic() - self.idle_seconds
+			for user_id in list(self._users):
+				if self._users[user_id].last_seen >= cutoff:
+					break
+				self._evict(user_id)
+		while self._bytes > self.max_total_bytes and len(self._users) > 1:
+			self._evict(next(iter(self._users)))
+		active = self._users.get(active_user_id)
+		while self._bytes > self.max_total_bytes and active is not None and len(active.turns) > 1:
+			self._drop_oldest(active)
@@ -0,0 +1,247 @@
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from module.imbalance import imbalance_config, imbalance_strategy, resample
+from module.lazy import lazy_import
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+pd = lazy_import("pandas", "dataframes")
+nltk = lazy_import("nltk", "nltk")
+nltk_corpus = lazy_import("nltk.corpus", "nltk")
+nltk_stem = lazy_import("nltk.stem", "nltk")
+sklearn_text = lazy_import("sklearn.feature_extraction.text", "sklearn_preprocessing")
+sklearn_preprocessing = lazy_import("sklearn.preprocessing", "sklearn_preprocessing")
+sklearn_model_selection = lazy_import("sklearn.model_selection", "sklearn_preprocessing")
+
+preprocess_workers = int(os.getenv('PI_PREPROCESS_WORKERS', str(os.cpu_count() or 1)))
+preprocess_chunk_size = int(os.getenv('PI_PREPROCESS_CHUNK_SIZE', '20000'))
+# Distinct words each worker keeps lemmas for; word frequencies are Zipfian, so a modest cache catches most tokens
+lemma_cache_size = int(os.getenv('PI_LEMMA_CACHE_SIZE', '200000'))
+
+TEXT_COLUMN = 'text_column'
+LABEL_COLUMN = 'label_column'
+TFIDF_MAX_FEATURES = 5000
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+# Bump when a change to this pipeline changes its output, so cached artifacts are rebuilt
+PREPROCESSING_VERSION = 2
+# NLTK data this pipeline reads; fetched by download_nltk_data()
+NLTK_PACKAGES = ('stopwords', 'punkt', 'wordnet')
+
+_url = re.compile(r"https?://\S+|www\.\S+")
+# One pass over a plain character class also collapses whitespace
+_non_letters = re.compile(r"[^a-z]+")
+
+
+def clean_text(text):
+	"""Lower-case text and strip URLs, digits and punctuation, leaving single-spaced words."""
+	return _non_letters.sub(" ", _url.sub(" ", str(text).lower())).strip()
+
+
+def clean_texts(texts):
+	"""clean_text for a list of strings, with the patterns bound once."""
+	url_sub, non_letters_sub = _url.sub, _non_letters.sub
+	return [non_letters_sub(" ", url_sub(" ", str(text).lower())).strip() for text in texts]
+
+
+def clean_text_column(texts):
+	"""clean_texts for a pandas Series, keeping its index."""
+	return pd.Series(clean_texts(texts.tolist()), index=texts.index, dtype=object)
+
+
+def download_nltk_data():
+	"""Download the NLTK corpora used by this pipeline; return whether all are available."""
+	return all(nltk.download(package, quiet=True) for package in NLTK_PACKAGES)
+
+
+_stopwords = None
+_lemmatizer = None
+
+
+def get_stopwords():
+	"""Return this process's English stopword set, loaded once."""
+	global _stopwords
+	if _stopwords is None:
+		_stopwords = frozenset(nltk_corpus.stopwords.words('english'))
+	return _stopwords
+
+
+def get_lemmatizer():
+	"""Return this process's WordNet lemmatizer, with WordNet loaded once."""
+	global _lemmatizer
+	if _lemmatizer is None:
+		lemmatizer = nltk_stem.WordNetLemmatizer()
+		lemmatizer.lemmatize("warm")
+		_lemmatizer = lemmatizer
+	return _lemmatizer
+
+
+@lru_cache(maxsize=lemma_cache_size)
+def lemmatize_word(word):
+	return get_lemmatizer().lemmatize(word)
+
+
+def tokenize_text(text):
+	"""Split cleaned text into words, dropping stopwords.
+
+	Cleaned text holds only single-spaced lower-case letters, so splitting on
+	spaces gives the same tokens as a full tokenizer at a fraction of the cost.
+	"""
+	stopwords = get_stopwords()
+	return [token for token in text.split() if token not in stopwords]
+
+
+def lemmatize_tokens(tokens):
+	return [lemmatize_word(token) for token in tokens]
+
+
+def _init_worker():
+	get_stopwords()
+	get_lemmatizer()
+
+
+def _lemmatize_chunk(texts):
+	"""Tokenize and lemmatize a list of cleaned texts in one worker call."""
+	stopwords = get_stopwords()
+	return [[lemmatize_word(token) for token in text.split() if token not in stopwords] for text in texts]
+
+
+def _preprocess_chunk(texts):
+	"""Clean, tokenize and lemmatize a list of raw texts in one worker call."""
+	cleaned = clean_texts(texts)
+	return cleaned, _lemmatize_chunk(cleaned)
+
+
+class TextPreprocessor:
+	"""Clean, tokenize and lemmatize text columns using every core.
+
+	Columns are split into chunks of chunk_size rows and handed to a pool of
+	worker processes, which clean, tokenize and lemmatize whole chunks at a time.
+	Tokens come from splitting the cleaned text, which is all single-spaced
+	lower-case letters. Each worker loads the stopwords and lemmatizer once and
+	memoizes lemmas, so repeated words cost a dict lookup; the pool is kept until
+	close() so the caches stay warm across calls. Inputs of at most one chunk, or
+	workers <= 1, are processed in this process.
+	"""
+
+	def __init__(self, workers=preprocess_workers, chunk_size=preprocess_chunk_size):
+		self.workers = workers
+		self.chunk_size = chunk_size
+		self._executor = None
+		self._lock = threading.Lock()
+
+	def clean(self, texts):
+		return clean_text_column(texts)
+
+	def lemmatize(self, cleaned_texts):
+		"""Return a Series of lemmatized token lists aligned with cleaned_texts."""
+		tokens = [row for chunk in self._map(_lemmatize_chunk, cleaned_texts.tolist()) for row in chunk]
+		return pd.Series(tokens, index=cleaned_texts.index, dtype=object)
+
+	def transform(self, texts):
+		"""Return a DataFrame with cleaned_text and lemmatized_tokens columns for texts."""
+		cleaned, tokens = [], []
+		for chunk_cleaned, chunk_tokens in self._map(_preprocess_chunk, texts.tolist()):
+			cleaned.extend(chunk_cleaned)
+			tokens.extend(chunk_tokens)
+		return pd.DataFrame({"cleaned_text": cleaned, "lemmatized_tokens": tokens}, index=texts.index)
+
+	def _map(self, function, rows):
+		start = time.perf_counter()
+		chunks = [rows[i:i + self.chunk_size] for i in range(0, len(rows), self.chunk_size)]
+		if self.workers <= 1 or len(chunks) <= 1:
+			results = [function(chunk) for chunk in chunks]
+		else:
+			results = list(self._get_executor().map(function, chunks))
+		logging.info(f"Preprocessed {len(rows)} rows in {time.perf_counter() - start:.2f}s "
+					 f"({len(chunks)} chunk(s), {self.workers} worker(s))")
+		return results
+
+	def _get_executor(self):
+		if self._executor is None:
+			with self._lock:
+				if self._executor is None:
+					self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+		return self._executor
+
+	def close(self):
+		with self._lock:
+			if self._executor is not None:
+				self._executor.shutdown()
+				self._executor = None
+
+
+_text_preprocessor = None
+
+
+def get_text_preprocessor():
+	"""Return the shared TextPreprocessor."""
+	global _text_preprocessor
+	if _text_preprocessor is None:
+		_text_preprocessor = TextPreprocessor()
+	return _text_preprocessor
+
+
+def load_data(file_path):
+	"""Read a CSV or JSON lines export into a DataFrame."""
+	if str(file_path).endswith(('.jsonl', '.json')):
+		return pd.read_json(file_path, lines=str(file_path).endswith('.jsonl'))
+	return pd.read_csv(file_path)
+
+
+def iter_data(file_path, chunk_rows):
+	"""Yield DataFrames of at most chunk_rows rows from a CSV or JSON lines export.
+
+	Plain JSON documents cannot be read incrementally and come back as one frame.
+	"""
+	if str(file_path).endswith('.jsonl'):
+		yield from pd.read_json(file_path, lines=True, chunksize=chunk_rows)
+	elif str(file_path).endswith('.json'):
+		yield load_data(file_path)
+	else:
+		yield from pd.read_csv(file_path, chunksize=chunk_rows)
+
+
+def handle_missing_values(df):
+	"""Drop rows without text or label."""
+	return df.dropna(subset=[TEXT_COLUMN, LABEL_COLUMN]).reset_index(drop=True)
+
+
+def fit_features(texts, max_features=TFIDF_MAX_FEATURES):
+	"""Fit a TF-IDF vectorizer on texts and return (vectorizer, features)."""
+	vectorizer = sklearn_text.TfidfVectorizer(max_features=max_features)
+	return vectorizer, vectorizer.fit_transform(texts)
+
+
+def extract_features(texts, max_features=TFIDF_MAX_FEATURES):
+	return fit_features(texts, max_features)[1]
+
+
+def encode_labels(labels):
+	return sklearn_preprocessing.LabelEncoder().fit_transform(labels)
+
+
+def split_data(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE):
+	return sklearn_model_selection.train_test_split(X, y, test_size=test_size, random_state=random_state, stratify=y)
+
+
+def handle_imbalanced_data(X, y, strategy=imbalance_strategy, random_state=RANDOM_STATE):
+	"""Rebalance the training set with an imbalance strategy (PI_IMBALANCE_STRATEGY by default)."""
+	return resample(X, y, strategy, random_state)
+
+
+def preprocessing_config():
+	"""Settings shared by every preprocess_data run that change its output."""
+	return {
+		"version": PREPROCESSING_VERSION,
+		"columns": [TEXT_COLUMN, LABEL_COLUMN],
+		"split": {"test_size": TEST_SIZE, "random_state": RANDOM_STATE},
+		"imbalance": {**imbalance_config(), "random_state": RANDOM_STATE},
+	}
@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+prompt_token_budget = int(os.getenv('PI_PROMPT_TOKEN_BUDGET', '3000'))
+prompt_tokenizer_encoding = os.getenv('PI_PROMPT_TOKENIZER', 'cl100k_base')
+
+# Rough per-message overhead of the chat format (role markers and separators)
+MESSAGE_TOKEN_OVERHEAD = 4
+WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+	"""Count tokens locally with tiktoken, or estimate them when it is not installed."""
+
+	def __init__(self, encoding_name=prompt_tokenizer_encoding):
+		self.encoding = None
+		try:
+			import tiktoken
+			self.encoding = tiktoken.get_encoding(encoding_name)
+		except ImportError:
+			logging.warning("Package 'tiktoken' not installed; prompt token counts are estimated.")
+		except Exception as e:
+			logging.error(f"Error loading tokenizer '{encoding_name}': {e}")
+
+	def count(self, text):
+		"""Return the number of tokens in text."""
+		if self.encoding is not None:
+			return len(self.encoding.encode(text))
+		# Word pieces run about 4/3 tokens per word for English text
+		return (len(WORD_PATTERN.findall(text)) * 4 + 2) // 3
+
+
+def serialize_entry(entry):
+	"""Render one context entry as a single prompt line."""
+	if isinstance(entry, str):
+		return entry
+	return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class PromptBuilder:
+	"""Assemble chat prompts whose context fits a token budget.
+
+	The most recent recent_turns entries are kept first, then the remaining budget
+	is filled with the older entries that share the most words with the current
+	message. Serialized entries and their token counts are memoized, and the
+	context prefix for each user is extended rather than rebuilt when the selection
+	only grew since the previous turn. Per-user state is kept for at most
+	max_users users, least recently prompted first out; pass forget as a
+	ConversationStore's on_evict to drop it together with the history.
+	"""
+
+	def __init__(self, token_budget=prompt_token_budget, recent_turns=4, system_prompt="You are a helpful assistant.",
+				 counter=None, cache_size=4096, max_users=1024):
+		self.token_budget = token_budget
+		self.recent_turns = recent_turns
+		self.system_prompt = system_prompt
+		self.counter = counter or TokenCounter()
+		self.cache_size = cache_size
+		self.max_users = max_users
+		self._segments = OrderedDict()
+		self._prefixes = OrderedDict()
+		self.last_prompt_tokens = OrderedDict()
+
+	def build(self, user_id, text, entries):
+		"""Return {"messages", "prompt_tokens", "context_entries"} for the user's next turn."""
+		system_tokens = self.counter.count(self.system_prompt) + MESSAGE_TOKEN_OVERHEAD
+		user_tokens = self.counter.count(text) + MESSAGE_TOKEN_OVERHEAD
+		available = self.token_budget - system_tokens - user_tokens
+
+		segments = [self._segment(entry) for entry in entries]
+		selected = self._select(segments, set(WORD_PATTERN.findall(text.lower())), available)
+		prefix, prefix_tokens = self._prefix(user_id, [segments[i] for i in selected])
+
+		system_content = self.system_prompt
+		if prefix:
+			system_content = f"{self.system_prompt}\nContext:\n{prefix}"
+		prompt_tokens = system_tokens + user_tokens + prefix_tokens
+		self.last_prompt_tokens[user_id] = prompt_tokens
+		self.last_prompt_tokens.move_to_end(user_id)
+		while len(self.last_prompt_tokens) > self.max_users:
+			self.forget(next(iter(self.last_prompt_tokens)))
+		return {
+			"messages": [
+				{"role": "system", "content": system_content},
+				{"role": "user", "content": text}
+			],
+			"prompt_tokens": prompt_tokens,
+			"context_entries": len(selected),
+		}
+
+	def forget(self, user_id):
+		"""Drop the cached prefix for user_id."""
+		self._prefixes.pop(user_id, None)
+		self.last_prompt_tokens.pop(user_id, None)
+
+	def _segment(self, entry):
+		line = serialize_entry(entry)
+		segment = self._segments.get(line)
+		if segment is None:
+			# Each context line costs its own tokens plus one for the newline separator
+			segment = (line, self.counter.count(line) + 1, frozenset(WORD_PATTERN.findall(line.lower())))
+			self._segments[line] = segment
+			if len(self._segments) > self.cache_size:
+				self._segments.popitem(last=False)
+		else:
+			self._segments.move_to_end(line)
+		return segment
+
+	def _select(self, segments, query_words, available):
+		chosen = set()
+		spent = 0
+		newest_first = range(len(segments) - 1, -1, -1)
+		for i in newest_first[:self.recent_turns]:
+			if spent + segments[i][1] > available:
+				break
+			chosen.add(i)
+			spent += segments[i][1]
+
+		older = [i for i in newest_first[self.recent_turns:]]
+		older.sort(key=lambda i: len(query_words & segments[i][2]) / (1 + len(segments[i][2])) ** 0.5, reverse=True)
+		for i in older:
+			if spent + segments[i][1] <= available:
+				chosen.add(i)
+				spent += segments[i][1]
+		return sorted(chosen)
+
+	def _prefix(self, user_id, segments):
+		lines = tuple(segment[0] for segment in segments)
+		tokens = sum(segment[1] for segment in segments)
+		cached = self._prefixes.get(user_id)
+		if cached is not None and cached[0] == lines:
+			return cached[1], tokens
+		if cached is not None and lines[:len(cached[0])] == cached[0]:
+			new_lines = lines[len(cached[0]):]
+			prefix = "\n".join((cached[1],) + new_lines) if cached[1] else "\n".join(new_lines)
+		else:
+			prefix = "\n".join(lines)
+		self._prefixes[user_id] = (lines, prefix)
+		self._prefixes.move_to_end(user_id)
+		return prefix, tokens
@@ -0,0 +1,137 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import deque
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+alpha_vantage_per_minute = float(os.getenv('PI_ALPHA_VANTAGE_PER_MINUTE', '5'))
+alpha_vantage_burst = int(os.getenv('PI_ALPHA_VANTAGE_BURST', '5'))
+newsapi_per_minute = float(os.getenv('PI_NEWSAPI_PER_MINUTE', '10'))
+newsapi_burst = int(os.getenv('PI_NEWSAPI_BURST', '5'))
+rate_limit_max_wait = float(os.getenv('PI_RATE_LIMIT_MAX_WAIT', '3'))
+
+
+class QuotaExceeded(Exception):
+	"""Raised when a provider's budget cannot cover a call within the allowed wait."""
+
+	def __init__(self, provider, retry_after):
+		super().__init__(f"{provider} quota exhausted; retry in {retry_after:.0f}s")
+		self.provider = provider
+		self.retry_after = retry_after
+
+
+class TokenBucket:
+	"""Token bucket refilled continuously at rate tokens per second, holding at most capacity."""
+
+	def __init__(self, rate, capacity):
+		self.rate = rate
+		self.capacity = capacity
+		self.tokens = float(capacity)
+		self.updated = time.monotonic()
+
+	def _refill(self):
+		now = time.monotonic()
+		self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+		self.updated = now
+
+	def try_take(self):
+		self._refill()
+		if self.tokens >= 1:
+			self.tokens -= 1
+			return True
+		return False
+
+	def available(self):
+		self._refill()
+		return self.tokens
+
+	def wait_time(self, count=1):
+		"""Seconds until count tokens will have accumulated."""
+		self._refill()
+		return max(0.0, (count - self.tokens) / self.rate)
+
+
+class ProviderScheduler:
+	"""Admit calls to one quota-limited provider through a token bucket.
+
+	acquire() returns at once while the bucket has tokens. Otherwise the caller is
+	queued by priority (lower runs first) and released as tokens refill, unless
+	its estimated wait exceeds max_wait, in which case QuotaExceeded is raised so
+	the caller can answer from cache or ask the user to try later.
+	"""
+
+	def __init__(self, name, per_minute, burst, max_wait=rate_limit_max_wait):
+		self.name = name
+		self.per_minute = per_minute
+		self.bucket = TokenBucket(per_minute / 60.0, burst)
+		self.max_wait = max_wait
+		self._queue = []
+		self._sequence = itertools.count()
+		self._dispatcher = None
+		self._granted_at = deque()
+		self._counts = {"granted": 0, "queued": 0, "rejected": 0}
+
+	async def acquire(self, priority=0, max_wait=None):
+		max_wait = self.max_wait if max_wait is None else max_wait
+		if not self._queue and self.bucket.try_take():
+			self._grant()
+			return
+		# The caller stands behind everyone already waiting
+		wait = self.bucket.wait_time(len(self._queue) + 1)
+		if wait > max_wait:
+			self._counts["rejected"] += 1
+			raise QuotaExceeded(self.name, wait)
+		future = asyncio.get_running_loop().create_future()
+		heapq.heappush(self._queue, (priority, next(self._sequence), future))
+		self._counts["queued"] += 1
+		if self._dispatcher is None or self._dispatcher.done():
+			self._dispatcher = asyncio.ensure_future(self._dispatch())
+		await future
+
+	def metrics(self):
+		"""Return quota counters and the share of the per-minute budget used in the last minute."""
+		self._expire_grants()
+		return {
+			**self._counts,
+			"per_minute": self.per_minute,
+			"used_last_minute": len(self._granted_at),
+			"utilisation": len(self._granted_at) / self.per_minute if self.per_minute else 0.0,
+			"tokens_available": round(self.bucket.available(), 2),
+			"queue_depth": len(self._queue),
+		}
+
+	def _grant(self):
+		self._counts["granted"] += 1
+		self._granted_at.append(time.monotonic())
+		self._expire_grants()
+
+	def _expire_grants(self):
+		cutoff = time.monotonic() - 60
+		while self._granted_at and self._granted_at[0] < cutoff:
+			self._granted_at.popleft()
+
+	async def _dispatch(self):
+		while self._queue:
+			delay = self.bucket.wait_time()
+			if delay > 0:
+				await asyncio.sleep(delay)
+				continue
+			_, _, future = heapq.heappop(self._queue)
+			if future.cancelled():
+				continue
+			self.bucket.try_take()
+			self._grant()
+			future.set_result(None)
+
+
+def default_schedulers():
+	"""Return fresh schedulers for the quota-limited gateway endpoints."""
+	return {
+		"stock": ProviderScheduler("alphavantage", alpha_vantage_per_minute, alpha_vantage_burst),
+		"news": ProviderScheduler("newsapi", newsapi_per_minute, newsapi_burst),
+	}
@@ -0,0 +1,256 @@
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Set PI_REASONING_SEED to an integer for deterministic, cached reasoning; unset, choices are fresh on every call
+_seed_setting = os.getenv('PI_REASONING_SEED', '')
+reasoning_seed = int(_seed_setting) if _seed_setting.strip() else None
+reasoning_cache_size = int(os.getenv('PI_REASONING_CACHE_SIZE', '1024'))
+# Seconds universal_reasoning waits for perspectives before answering with those that finished
+reasoning_latency_budget = float(os.getenv('PI_REASONING_BUDGET', '2.0'))
+reasoning_max_workers = int(os.getenv('PI_REASONING_WORKERS', '8'))
+
+
+class Perspective:
+	"""A named reasoning perspective: a choice among templates, or a sync or async function of the question.
+
+	Templates are '{question}' format strings, compiled once into bound format
+	methods; a choice is drawn from the rng passed in, or the global random state.
+	Sync functions run inline unless blocking is true (e.g. they call the LLM or
+	the database), in which case the engine runs them on its thread pool. timeout
+	bounds how long the engine waits for this perspective. Functions cannot be
+	seeded, so mark one deterministic only if it answers a question the same way
+	every time; the engine caches answers only when every perspective is.
+	"""
+
+	__slots__ = ("name", "templates", "function", "timeout", "blocking", "is_async", "deterministic")
+
+	def __init__(self, name, templates=None, function=None, timeout=None, blocking=False, deterministic=False):
+		if (templates is None) == (function is None):
+			raise ValueError(f"Perspective '{name}' needs either templates or a function")
+		self.name = name
+		self.templates = tuple(template.format for template in templates) if templates is not None else None
+		self.function = function
+		self.timeout = timeout
+		self.blocking = blocking
+		self.is_async = asyncio.iscoroutinefunction(function)
+		self.deterministic = templates is not None or deterministic
+
+	def __call__(self, question, rng=random):
+		if self.function is not None:
+			return self.function(question)
+		return rng.choice(self.templates)(question=question)
+
+
+DAVINCI_PERSPECTIVE = Perspective("davinci_insights", templates=(
+	"What if we view '{question}' from the perspective of the stars?",
+	"Consider '{question}' as if it's a masterpiece of the universe.",
+	"Reflect on '{question}' through the lens of nature's design.",
+))
+INTUITION_PERSPECTIVE = Perspective("human_intuition", templates=(
+	"How does this question make you feel?",
+	"What emotional connection do you have with this topic?",
+	"What does your gut instinct tell you about this?",
+))
+NEURAL_PERSPECTIVE = Perspective("neural_network_thinking", templates=(
+	"Process '{question}' through a multi-layered neural network.",
+	"Apply deep learning to uncover hidden insights about '{question}'.",
+	"Use machine learning to predict patterns in '{question}'.",
+))
+QUANTUM_PERSPECTIVE = Perspective("quantum_computing_thinking", templates=(
+	"Consider '{question}' using quantum superposition principles.",
+	"Apply quantum entanglement to find connections in '{question}'.",
+	"Utilize quantum computing to solve '{question}' more efficiently.",
+))
+KINDNESS_PERSPECTIVE = Perspective("resilient_kindness", templates=(
+	"Despite losing everything, seeing life as a chance to grow.",
+	"Finding strength in kindness after facing life's hardest trials.",
+	"Embracing every challenge as an opportunity for growth and compassion.",
+))
+FALLACY_PERSPECTIVE = Perspective("identify_and_refute_fallacies", templates=(
+	"This is an ad hominem fallacy. Let's focus on the argument itself rather than attacking the person.",
+	"This is a straw man fallacy. The argument is being misrepresented.",
+	"This is a false dilemma fallacy. There are more options than presented.",
+	"This is a slippery slope fallacy. The conclusion does not necessarily follow from the premise.",
+	"This is circular reasoning. The argument's conclusion is used as a premise.",
+	"This is a hasty generalization. The conclusion is based on insufficient evidence.",
+	"This is a red herring fallacy. The argument is being diverted to an irrelevant topic.",
+	"This is a post hoc ergo propter hoc fallacy. Correlation does not imply causation.",
+	"This is an appeal to authority fallacy. The argument relies on the opinion of an authority figure.",
+	"This is a bandwagon fallacy. The argument assumes something is true because many people believe it.",
+	"This is a false equivalence fallacy. The argument equates two things that are not equivalent.",
+))
+
+
+class ReasoningEngine:
+	"""Run a pluggable list of perspectives concurrently and combine their answers.
+
+	reason_async() starts every perspective at once, waits at most latency_budget
+	seconds (and each perspective at most its own timeout) and answers with the
+	perspectives that finished, in registration order. reason() is the blocking
+	equivalent for code that is not running an event loop; coroutines must await
+	reason_async() instead.
+
+	With a seed, each template perspective draws its choices from a generator
+	seeded by the seed, its name and the question, so a question always gets the
+	same answer whatever order perspectives finish in; complete answers are kept
+	in an LRU cache of cache_size entries as long as every perspective is
+	deterministic. Without a seed the global random state is used and nothing is
+	cached.
+	"""
+
+	def __init__(self, perspectives=(), seed=reasoning_seed, cache_size=reasoning_cache_size,
+				 latency_budget=reasoning_latency_budget, max_workers=reasoning_max_workers):
+		self.perspectives = list(perspectives)
+		self.seed = seed
+		self.cache_size = cache_size
+		self.latency_budget = latency_budget
+		self.max_workers = max_workers
+		self._executor = None
+		self._cache = OrderedDict()
+		self._lock = threading.Lock()
+		self._stats = {"hits": 0, "misses": 0, "timeouts": 0, "errors": 0}
+
+	def register(self, perspective):
+		"""Add a perspective after the existing ones and return it."""
+		self.perspectives.append(perspective)
+		self.clear()
+		return perspective
+
+	def reason(self, question):
+		"""Return the newline-joined answers of the perspectives that finished in time."""
+		cached = self._cached(question)
+		if cached is not None:
+			return cached["answer"]
+		perspectives = list(self.perspectives)
+		if any(perspective.is_async or perspective.blocking for perspective in perspectives):
+			try:
+				asyncio.get_running_loop()
+			except RuntimeError:
+				pass
+			else:
+				raise RuntimeError("ReasoningEngine.reason() cannot run inside an event loop; await reason_async() instead")
+			return asyncio.run(self._reason(question, perspectives, self.latency_budget))["answer"]
+		# Only cheap inline perspectives: no event loop needed
+		start = time.perf_counter()
+		return self._combine(question, [self._run_inline(p, question) for p in perspectives], start)["answer"]
+
+	async def reason_async(self, question, latency_budget=None):
+		"""Return {"answer", "perspectives", "seconds"}; each perspective entry has name, status, response and seconds."""
+		cached = self._cached(question)
+		if cached is not None:
+			return cached
+		budget = self.latency_budget if latency_budget is None else latency_budget
+		return await self._reason(question, list(self.perspectives), budget)
+
+	async def _reason(self, question, perspectives, budget):
+		start = time.perf_counter()
+		tasks = [asyncio.ensure_future(self._run(perspective, question)) for perspective in perspectives]
+		done, pending = await asyncio.wait(tasks, timeout=budget) if tasks else (set(), set())
+		for task in pending:
+			task.cancel()
+		results = []
+		for perspective, task in zip(perspectives, tasks):
+			if task in done:
+				results.append(task.result())
+			else:
+				results.append({"name": perspective.name, "status": "timeout", "response": None,
+								"seconds": round(time.perf_counter() - start, 6)})
+		return self._combine(question, results, start)
+
+	def _combine(self, question, results, start):
+		result = {
+			"answer": "\n".join(entry["response"] for entry in results if entry["status"] == "ok"),
+			"perspectives": results,
+			"seconds": round(time.perf_counter() - start, 6),
+		}
+		with self._lock:
+			for entry in results:
+				if entry["status"] == "timeout":
+					self._stats["timeouts"] += 1
+				elif entry["status"] == "error":
+					self._stats["errors"] += 1
+			# Partial answers are not cached so a slow perspective can still contribute next time
+			if self.seed is not None and all(entry["status"] == "ok" for entry in results) and \
+					all(perspective.deterministic for perspective in self.perspectives):
+				self._cache[question] = result
+				if len(self._cache) > self.cache_size:
+					self._cache.popitem(last=False)
+		return result
+
+	def question_seed(self, question, name=""):
+		"""Return the generator seed for a perspective's answer to question under this engine's seed."""
+		digest = hashlib.blake2b(f"{self.seed}\0{name}\0{question}".encode("utf-8"), digest_size=8).digest()
+		return int.from_bytes(digest, "big")
+
+	def stats(self):
+		with self._lock:
+			return {**self._stats, "entries": len(self._cache), "cache_size": self.cache_size}
+
+	def clear(self):
+		with self._lock:
+			self._cache.clear()
+
+	def _cached(self, question):
+		if self.seed is None:
+			return None
+		with self._lock:
+			result = self._cache.get(question)
+			if result is not None:
+				self._cache.move_to_end(question)
+				self._stats["hits"] += 1
+			else:
+				self._stats["misses"] += 1
+			return result
+
+	def _run_inline(self, perspective, question):
+		start = time.perf_counter()
+		entry = {"name": perspective.name, "status": "ok", "response": None}
+		try:
+			entry["response"] = str(perspective(question, self._rng(perspective, question)))
+		except Exception as e:
+			logging.error(f"Perspective '{perspective.name}' failed: {e}")
+			entry.update(status="error", error=str(e))
+		entry["seconds"] = round(time.perf_counter() - start, 6)
+		return entry
+
+	async def _run(self, perspective, question):
+		if not (perspective.is_async or perspective.blocking):
+			return self._run_inline(perspective, question)
+		start = time.perf_counter()
+		entry = {"name": perspective.name, "status": "ok", "response": None}
+		try:
+			if perspective.is_async:
+				call = perspective.function(question)
+			else:
+				call = asyncio.get_running_loop().run_in_executor(self._get_executor(), perspective, question,
+																  self._rng(perspective, question))
+			entry["response"] = str(await asyncio.wait_for(call, perspective.timeout))
+		except asyncio.TimeoutError:
+			entry["status"] = "timeout"
+		except Exception as e:
+			logging.error(f"Perspective '{perspective.name}' failed: {e}")
+			entry.update(status="error", error=str(e))
+		entry["seconds"] = round(time.perf_counter() - start, 6)
+		return entry
+
+	def _rng(self, perspective, question):
+		if self.seed is None:
+			return random
+		return random.Random(self.question_seed(question, perspective.name))
+
+	def _get_executor(self):
+		if self._executor is None:
+			with self._lock:
+				if self._executor is None:
+					self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="perspective")
+		return self._executor
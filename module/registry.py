@@ -0,0 +1,158 @@
+import inspect
+import json
+import logging
+import re
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_NAME_PATTERN = r"^[a-zA-Z_][a-zA-Z0-9_]*$"
+# Schema type names -> accepted Python types; other names (e.g. TurnContext) are not checked
+TYPE_CHECKS = {
+	"str": str,
+	"int": int,
+	"float": (int, float),
+	"bool": bool,
+	"list": list,
+	"dict": dict,
+}
+
+
+class FunctionCallError(ValueError):
+	"""Raised when a call names an unknown function or passes bad parameters."""
+
+
+def load_json_document(file_path):
+	"""Load the first JSON document in file_path, ignoring anything pasted after it."""
+	with open(file_path, 'r', encoding='utf-8') as file:
+		text = file.read()
+	return json.JSONDecoder().raw_decode(text.lstrip())[0]
+
+
+def read_function_specs(document):
+	"""Return ({name: {parameter: type name}}, name pattern or None) described by one schema document.
+
+	Understands the bot description files ({"bot": {"functions": [...]}}), function
+	indexes ({"functions": {name: {"parameters": [...]}}}) and the JSON Schema for
+	such indexes, which only contributes the pattern function names must match.
+	"""
+	specs = {}
+	pattern = None
+	if isinstance(document.get("bot"), dict):
+		for function_data in document["bot"].get("functions", []):
+			specs[function_data["name"]] = dict(function_data.get("parameters") or {})
+	functions = document.get("functions")
+	if "$schema" in document:
+		patterns = list(document.get("properties", {}).get("functions", {}).get("patternProperties", {}))
+		pattern = patterns[0] if patterns else None
+	elif isinstance(functions, dict):
+		for name, function_data in functions.items():
+			specs[name] = {parameter: None for parameter in function_data.get("parameters", [])}
+	return specs, pattern
+
+
+def _compile_validator(name, function, parameter_types):
+	"""Build a validator for one function from its schema types and signature."""
+	signature = inspect.signature(function)
+	accepts_any = any(p.kind is p.VAR_KEYWORD for p in signature.parameters.values())
+	allowed = frozenset(
+		p.name for p in signature.parameters.values() if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)
+	)
+	required = frozenset(
+		p.name for p in signature.parameters.values()
+		if p.default is p.empty and p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)
+	)
+	checks = tuple(
+		(parameter, TYPE_CHECKS[type_name], type_name) for parameter, type_name in parameter_types.items()
+		if type_name in TYPE_CHECKS
+	)
+
+	def validate(parameters):
+		if not isinstance(parameters, dict):
+			raise FunctionCallError(f"{name}: parameters must be an object")
+		keys = parameters.keys()
+		missing = required - keys
+		if missing:
+			raise FunctionCallError(f"{name}: missing parameter(s) {', '.join(sorted(missing))}")
+		if not accepts_any:
+			unexpected = keys - allowed
+			if unexpected:
+				raise FunctionCallError(f"{name}: unexpected parameter(s) {', '.join(sorted(unexpected))}")
+		for parameter, expected, type_name in checks:
+			if parameter in parameters and not isinstance(parameters[parameter], expected):
+				raise FunctionCallError(f"{name}: parameter '{parameter}' should be {type_name}")
+
+	return validate
+
+
+class FunctionRegistry:
+	"""Name -> (callable, validator) table for functions that may be called from data files.
+
+	Validators are built once at registration from the schema's parameter types
+	and the callable's signature, so dispatch is a dict lookup and validation only
+	checks key sets and isinstance.
+	"""
+
+	def __init__(self, name_pattern=DEFAULT_NAME_PATTERN):
+		self.name_pattern = re.compile(name_pattern)
+		self._entries = {}
+
+	def __contains__(self, name):
+		return name in self._entries
+
+	def __len__(self):
+		return len(self._entries)
+
+	def names(self):
+		return sorted(self._entries)
+
+	def register(self, name, function, parameter_types=None):
+		if not self.name_pattern.match(name):
+			raise FunctionCallError(f"Invalid function name '{name}'")
+		self._entries[name] = (function, _compile_validator(name, function, parameter_types or {}))
+
+	def validate(self, name, parameters):
+		"""Raise FunctionCallError unless name is registered and parameters fit its schema."""
+		entry = self._entries.get(name)
+		if entry is None:
+			raise FunctionCallError(f"Function {name} not found.")
+		entry[1](parameters)
+
+	def resolve(self, name):
+		"""Return the callable registered under name, or None."""
+		entry = self._entries.get(name)
+		return entry[0] if entry is not None else None
+
+	def call(self, name, parameters):
+		self.validate(name, parameters)
+		return self._entries[name][0](**parameters)
+
+	@classmethod
+	def from_schema_files(cls, paths, namespace):
+		"""Build a registry from schema files, binding each described name found in namespace.
+
+		Missing or unreadable files are logged and skipped, as are described
+		functions that namespace does not define as a callable.
+		"""
+		specs = {}
+		name_pattern = DEFAULT_NAME_PATTERN
+		for path in paths:
+			try:
+				file_specs, pattern = read_function_specs(load_json_document(path))
+			except (OSError, ValueError) as e:
+				logging.warning(f"Skipping function schema '{path}': {e}")
+				continue
+			for name, parameter_types in file_specs.items():
+				# Index files list parameter names only; the signature covers those
+				specs.setdefault(name, {}).update({p: t for p, t in parameter_types.items() if t})
+			name_pattern = pattern or name_pattern
+
+		registry = cls(name_pattern)
+		for name, parameter_types in specs.items():
+			function = namespace.get(name)
+			if not callable(function):
+				logging.debug(f"Function '{name}' is described but not defined here; not registered.")
+				continue
+			registry.register(name, function, parameter_types)
+		logging.info(f"Registered {len(registry)} functions from {len(paths)} schema file(s).")
+		return registry
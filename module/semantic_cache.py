@@ -0,0 +1,263 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+
+from module.lazy import lazy_import
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+np = lazy_import("numpy", "semantic_cache")
+
+semantic_cache_path = os.getenv('PI_SEMANTIC_CACHE', os.path.join('.cache', 'semantic_cache.sqlite3'))
+semantic_cache_threshold = float(os.getenv('PI_SEMANTIC_CACHE_THRESHOLD', '0.9'))
+semantic_cache_ttl = float(os.getenv('PI_SEMANTIC_CACHE_TTL', '86400'))
+semantic_cache_max_entries = int(os.getenv('PI_SEMANTIC_CACHE_MAX_ENTRIES', '20000'))
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Words that do not change what is being asked; negations are deliberately absent
+STOPWORDS = frozenset(
+	"a about an and are as at be been being by can could did do does for from had has have how i if in into "
+	"is it its me my of on or our please s should so tell than that the their them then there these this those "
+	"to was we were what when where which who whom whose why will with would you your".split()
+)
+
+
+def normalize_question(text):
+	"""Lower-case, NFKC-normalize and collapse whitespace so trivially different questions match."""
+	return " ".join(TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()))
+
+
+def question_terms(text):
+	"""Return the content words, numbers and negations of a question, with plural 's' dropped.
+
+	Two questions can only share an answer when their terms are equal, so a
+	near-miss that swaps an entity, a number or "with" for "without" never hits.
+	"""
+	terms = set()
+	for word in normalize_question(text).split():
+		if word in STOPWORDS:
+			continue
+		if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+			word = word[:-1]
+		terms.add(word)
+	return frozenset(terms)
+
+
+def prompt_namespace(system_prompt):
+	"""Return the short key under which answers for one system prompt are grouped."""
+	return hashlib.sha1(system_prompt.encode("utf-8")).hexdigest()[:16]
+
+
+class HashingEmbedder:
+	"""Embed text locally as an L2-normalized bag of hashed terms and character trigrams.
+
+	Needs no model download and costs microseconds per question. Only
+	question_terms() are embedded, so rephrasings that differ in filler words
+	("what's", "tell me the") get the same vector; trigrams absorb typos.
+	"""
+
+	def __init__(self, dim=1024):
+		self.dim = dim
+
+	def __call__(self, text):
+		vector = np.zeros(self.dim, dtype=np.float32)
+		for word in sorted(question_terms(text)):
+			grams = [word] + [f"#{word}#"[i:i + 3] for i in range(len(word))]
+			for weight, gram in zip([2.0] + [1.0] * len(word), grams):
+				vector[zlib.crc32(gram.encode("utf-8")) % self.dim] += weight
+		norm = np.linalg.norm(vector)
+		return vector / norm if norm else vector
+
+
+class LSHIndex:
+	"""Approximate nearest-neighbour index for unit vectors using random-hyperplane hashing.
+
+	Each of num_tables tables buckets vectors by the signs of num_bits random
+	projections; a query's candidates are the union of its buckets, which the
+	caller re-ranks by exact cosine similarity.
+	"""
+
+	def __init__(self, dim, num_tables=8, num_bits=10, seed=0):
+		rng = np.random.default_rng(seed)
+		self.planes = rng.standard_normal((num_tables, num_bits, dim)).astype(np.float32)
+		self._weights = (1 << np.arange(num_bits)).astype(np.int64)
+		self._tables = [{} for _ in range(num_tables)]
+
+	def _signatures(self, vector):
+		return ((self.planes @ vector) > 0).astype(np.int64) @ self._weights
+
+	def add(self, key, vector):
+		for table, signature in zip(self._tables, self._signatures(vector)):
+			table.setdefault(int(signature), set()).add(key)
+
+	def remove(self, key, vector):
+		for table, signature in zip(self._tables, self._signatures(vector)):
+			bucket = table.get(int(signature))
+			if bucket is not None:
+				bucket.discard(key)
+				if not bucket:
+					del table[int(signature)]
+
+	def candidates(self, vector):
+		found = set()
+		for table, signature in zip(self._tables, self._signatures(vector)):
+			found |= table.get(int(signature), set())
+		return found
+
+
+class SemanticCache:
+	"""Answer cache that matches new questions to earlier ones by embedding similarity.
+
+	Answers are stored in a local SQLite file together with their question
+	embeddings and loaded into per-system-prompt LSH indexes on start-up. lookup()
+	returns a stored answer whose question has the same question_terms(), cosine
+	similarity of at least threshold and is younger than ttl seconds. Similarity
+	alone would match "GDP of Germany" to "GDP of France", so the terms check
+	limits hits to rephrasings; with the default HashingEmbedder equal terms give
+	equal vectors and threshold only matters for other embedders. Questions
+	without content terms ("what is it?") never hit. invalidate() drops
+	everything stored under one system prompt. The oldest entries are evicted
+	beyond max_entries.
+	"""
+
+	def __init__(self, path=semantic_cache_path, threshold=semantic_cache_threshold, ttl=semantic_cache_ttl,
+				 max_entries=semantic_cache_max_entries, embedder=None):
+		self.path = path
+		self.threshold = threshold
+		self.ttl = ttl
+		self.max_entries = max_entries
+		self.embedder = embedder or HashingEmbedder()
+		self._lock = threading.Lock()
+		self._namespaces = {}
+		self._entries = {}
+		self._stats = {"hits": 0, "misses": 0, "expired": 0, "stored": 0, "evicted": 0}
+		if os.path.dirname(path):
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+		self._conn = sqlite3.connect(path, check_same_thread=False)
+		self._conn.execute("PRAGMA journal_mode=WAL")
+		self._conn.execute(
+			"CREATE TABLE IF NOT EXISTS answers ("
+			"id INTEGER PRIMARY KEY, namespace TEXT NOT NULL, question TEXT NOT NULL, "
+			"answer TEXT NOT NULL, embedding BLOB NOT NULL, created REAL NOT NULL)"
+		)
+		self._conn.execute("CREATE INDEX IF NOT EXISTS answers_namespace ON answers (namespace)")
+		self._conn.commit()
+		self._load()
+
+	def lookup(self, question, system_prompt):
+		"""Return the cached answer for the closest earlier question, or None."""
+		vector = self.embedder(question)
+		terms = question_terms(question)
+		namespace = prompt_namespace(system_prompt)
+		now = time.time()
+		with self._lock:
+			index = self._namespaces.get(namespace)
+			best_id, best_score = None, self.threshold
+			expired = []
+			for entry_id in (index.candidates(vector) if index is not None else ()):
+				entry = self._entries[entry_id]
+				if now - entry["created"] > self.ttl:
+					expired.append(entry_id)
+					continue
+				score = float(entry["vector"] @ vector)
+				if score >= best_score and entry["terms"] == terms:
+					best_id, best_score = entry_id, score
+			for entry_id in expired:
+				self._remove(entry_id)
+			self._stats["expired"] += len(expired)
+			if expired:
+				self._conn.commit()
+			if best_id is None:
+				self._stats["misses"] += 1
+				return None
+			self._stats["hits"] += 1
+			logging.debug(f"Semantic cache hit ({best_score:.3f}) for question: {question}")
+			return self._entries[best_id]["answer"]
+
+	def store(self, question, system_prompt, answer):
+		"""Remember answer for question under system_prompt."""
+		vector = self.embedder(question).astype(np.float32)
+		namespace = prompt_namespace(system_prompt)
+		created = time.time()
+		with self._lock:
+			cursor = self._conn.execute(
+				"INSERT INTO answers (namespace, question, answer, embedding, created) VALUES (?, ?, ?, ?, ?)",
+				(namespace, question, answer, vector.tobytes(), created)
+			)
+			self._add(cursor.lastrowid, namespace, question, answer, vector, created)
+			self._stats["stored"] += 1
+			# _entries keeps insertion order, so the oldest entries come first
+			while len(self._entries) > self.max_entries:
+				self._remove(next(iter(self._entries)))
+				self._stats["evicted"] += 1
+			self._conn.commit()
+
+	def invalidate(self, system_prompt):
+		"""Drop every answer stored under system_prompt; returns how many were removed."""
+		namespace = prompt_namespace(system_prompt)
+		with self._lock:
+			removed = self._conn.execute("DELETE FROM answers WHERE namespace = ?", (namespace,)).rowcount
+			self._conn.commit()
+			self._namespaces.pop(namespace, None)
+			for entry_id in [i for i, entry in self._entries.items() if entry["namespace"] == namespace]:
+				del self._entries[entry_id]
+		return removed
+
+	def stats(self):
+		with self._lock:
+			return {**self._stats, "entries": len(self._entries), "namespaces": len(self._namespaces)}
+
+	def close(self):
+		with self._lock:
+			self._conn.close()
+
+	def _load(self):
+		cutoff = time.time() - self.ttl
+		self._conn.execute("DELETE FROM answers WHERE created < ?", (cutoff,))
+		self._conn.commit()
+		rows = self._conn.execute(
+			"SELECT id, namespace, question, answer, embedding, created FROM answers ORDER BY created"
+		).fetchall()
+		for entry_id, namespace, question, answer, embedding, created in rows:
+			vector = np.frombuffer(embedding, dtype=np.float32)
+			if vector.shape[0] == self._dim():
+				self._add(entry_id, namespace, question, answer, vector, created)
+		if rows:
+			logging.info(f"Loaded {len(self._entries)} semantic cache entries from {self.path}")
+
+	def _dim(self):
+		return getattr(self.embedder, "dim", None) or self.embedder("dimension probe").shape[0]
+
+	def _add(self, entry_id, namespace, question, answer, vector, created):
+		index = self._namespaces.get(namespace)
+		if index is None:
+			index = self._namespaces[namespace] = LSHIndex(vector.shape[0])
+		index.add(entry_id, vector)
+		self._entries[entry_id] = {"namespace": namespace, "terms": question_terms(question), "answer": answer,
+								   "vector": vector, "created": created}
+
+	def _remove(self, entry_id):
+		entry = self._entries.pop(entry_id)
+		self._namespaces[entry["namespace"]].remove(entry_id, entry["vector"])
+		self._conn.execute("DELETE FROM answers WHERE id = ?", (entry_id,))
+
+
+_semantic_cache = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache():
+	"""Return the shared SemanticCache for this process."""
+	global _semantic_cache
+	if _semantic_cache is None:
+		with _semantic_cache_lock:
+			if _semantic_cache is None:
+				_semantic_cache = SemanticCache()
+	return _semantic_cache
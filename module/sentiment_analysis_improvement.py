@@ -1,11 +1,18 @@
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-import torch
 from sklearn.metrics import accuracy_score, classification_report
 from sklearn.model_selection import train_test_split
 from textblob import TextBlob
-from transformers import BertForSequenceClassification, BertTokenizer, pipeline
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+try:
+	from module.inference import get_bert_engine
+	from module.utils import analyze_sentiment_vader, get_vader_analyzer
+except ImportError:  # imported as a top-level module from inside module/
+	from inference import get_bert_engine
+	from utils import analyze_sentiment_vader, get_vader_analyzer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -13,14 +20,27 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # Advanced Models: BERT for Sentiment Analysis
 class BertSentimentAnalyzer:
     def __init__(self):
-        self.tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
-        self.model = BertForSequenceClassification.from_pretrained('bert-base-uncased', num_labels=3)
-        self.pipeline = pipeline('sentiment-analysis', model=self.model, tokenizer=self.tokenizer)
+        self.engine = get_bert_engine().load()
+        self.tokenizer = self.engine.tokenizer
+        self.model = self.engine.model
 
     def analyze_sentiment(self, text):
-        result = self.pipeline(text)
+        result = self.engine.classify([text])
         return result
 
+    def analyze_sentiment_batch(self, texts):
+        return self.engine.classify(texts)
+
+def bert_polarity(prediction):
+    """Map a BERT {'label', 'score'} prediction onto a -1..1 polarity.
+
+    Three-label models are read as LABEL_0=negative, LABEL_1=neutral, LABEL_2=positive.
+    """
+    label = prediction['label'].lower()
+    named = {"negative": 0, "neutral": 1, "positive": 2}
+    index = named[label] if label in named else int(label.rsplit('_', 1)[-1])
+    return (index - 1) * prediction['score']
+
 # Sarcasm Detection: Placeholder function (requires specific dataset and model)
 def detect_sarcasm(text):
     # Placeholder implementation for sarcasm detection
@@ -38,11 +58,11 @@ def handle_negation(text):
 
 # Contextual Embeddings: Using BERT embeddings for better context understanding
 def get_bert_embeddings(text):
-    tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
-    model = BertForSequenceClassification.from_pretrained('bert-base-uncased')
-    inputs = tokenizer(text, return_tensors='pt')
-    outputs = model(**inputs)
-    return outputs
+    # Mean-pooled embeddings from the shared engine: one row per text, or a single vector for a str
+    engine = get_bert_engine()
+    if isinstance(text, str):
+        return engine.embed([text])[0]
+    return engine.embed(text)
 
 # Domain-Specific Models: Placeholder function (requires domain-specific training data)
 def train_domain_specific_model(domain_data):
@@ -75,21 +95,83 @@ def update_model_with_new_data(model, new_data):
 
 # Ensemble Methods: Combining multiple models for better accuracy
 class EnsembleSentimentAnalyzer:
-    def __init__(self):
-        self.textblob_analyzer = TextBlob()
-        self.vader_analyzer = SentimentIntensityAnalyzer()
+    """Average TextBlob, VADER and BERT polarity scores in one of three modes.
+
+    'sequential' runs the members one after another, 'parallel' runs them
+    concurrently in a worker pool, and 'cascade' returns the TextBlob/VADER
+    average when both agree in sign and their mean magnitude reaches
+    confidence_threshold, escalating to BERT only for ambiguous texts.
+    """
+
+    MODES = ("sequential", "parallel", "cascade")
+
+    def __init__(self, mode="parallel", confidence_threshold=0.5, max_workers=3):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown ensemble mode '{mode}'")
+        self.mode = mode
+        self.confidence_threshold = confidence_threshold
+        self.textblob_analyzer = TextBlob
+        self.vader_analyzer = get_vader_analyzer()
         self.bert_analyzer = BertSentimentAnalyzer()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ensemble")
+        self._stats_lock = threading.Lock()
+        self._latency = {name: [0, 0.0] for name in ("textblob", "vader", "bert")}
+        self._calls = 0
+        self._escalations = 0
 
     def analyze_sentiment(self, text):
-        sentiment_textblob = self.textblob_analyzer(text).sentiment.polarity
-        sentiment_vader = self.vader_analyzer.polarity_scores(text)['compound']
-        sentiment_bert = self.bert_analyzer.analyze_sentiment(text)[0]['label']
-        
+        members = {
+            "textblob": lambda: self.textblob_analyzer(text).sentiment.polarity,
+            "vader": lambda: self.vader_analyzer.polarity_scores(text)['compound'],
+            "bert": lambda: bert_polarity(self.bert_analyzer.analyze_sentiment(text)[0]),
+        }
+        with self._stats_lock:
+            self._calls += 1
+
+        if self.mode == "sequential":
+            scores = [self._timed(name, member) for name, member in members.items()]
+        elif self.mode == "parallel":
+            futures = [self.executor.submit(self._timed, name, member) for name, member in members.items()]
+            scores = [future.result() for future in futures]
+        else:
+            vader_future = self.executor.submit(self._timed, "vader", members["vader"])
+            sentiment_textblob = self._timed("textblob", members["textblob"])
+            sentiment_vader = vader_future.result()
+            agree = sentiment_textblob * sentiment_vader > 0
+            if agree and (abs(sentiment_textblob) + abs(sentiment_vader)) / 2.0 >= self.confidence_threshold:
+                return (sentiment_textblob + sentiment_vader) / 2.0
+            with self._stats_lock:
+                self._escalations += 1
+            scores = [sentiment_textblob, sentiment_vader, self._timed("bert", members["bert"])]
+
         # Combine results (simple averaging for demonstration purposes)
-        combined_sentiment = (sentiment_textblob + sentiment_vader + float(sentiment_bert)) / 3.0
-        
+        combined_sentiment = sum(scores) / len(scores)
+
         return combined_sentiment
 
+    def stats(self):
+        """Return per-member call counts and mean latency (ms) plus the BERT escalation rate."""
+        with self._stats_lock:
+            members = {
+                name: {"calls": calls, "mean_latency_ms": (total / calls * 1000.0) if calls else 0.0}
+                for name, (calls, total) in self._latency.items()
+            }
+            escalation_rate = self._escalations / self._calls if self._calls else 0.0
+            return {"mode": self.mode, "calls": self._calls, "escalation_rate": escalation_rate, "members": members}
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def _timed(self, name, member):
+        start = time.perf_counter()
+        try:
+            return member()
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self._latency[name][0] += 1
+                self._latency[name][1] += elapsed
+
 # Evaluation and Fine-Tuning: Function to evaluate and fine-tune models
 def evaluate_and_fine_tune_model(model, data, labels):
     _, X_test, y_train, y_test = train_test_split(data, labels, test_size=0.2)
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+
+from module.lazy import lazy_import
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+botbuilder_core = lazy_import("botbuilder.core", "bot_framework")
+botbuilder_schema = lazy_import("botbuilder.schema", "bot_framework")
+
+# Off by default: most channels show each streamed chunk as a separate message
+stream_responses_enabled = os.getenv('PI_STREAM_RESPONSES', 'false').lower() in ('1', 'true', 'yes')
+# "chunks" sends each finished sentence group as its own message; "update" edits one message in place
+stream_mode = os.getenv('PI_STREAM_MODE', 'chunks')
+stream_min_chars = int(os.getenv('PI_STREAM_MIN_CHARS', '80'))
+stream_flush_interval = float(os.getenv('PI_STREAM_FLUSH_INTERVAL', '0.75'))
+stream_typing_interval = float(os.getenv('PI_STREAM_TYPING_INTERVAL', '2.5'))
+# Log a metrics snapshot after every this many streams; 0 turns the log off
+stream_metrics_log_every = int(os.getenv('PI_STREAM_METRICS_LOG_EVERY', '100'))
+
+SENTENCE_BOUNDARY = re.compile(r"[.!?:;\n]\s+|\n")
+
+
+def _percentile(values, fraction):
+	if not values:
+		return None
+	ordered = sorted(values)
+	return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class StreamingMetrics:
+	"""Latency of streamed replies over the last window streams.
+
+	first_token is the time from sending the request to receiving the first
+	delta; first_send is when the user first saw text; total is the full stream.
+	A snapshot is logged after every log_every streams.
+	"""
+
+	def __init__(self, window=1000, log_every=stream_metrics_log_every):
+		self.log_every = log_every
+		self._lock = threading.Lock()
+		self._samples = {"first_token": deque(maxlen=window), "first_send": deque(maxlen=window),
+						 "total": deque(maxlen=window)}
+		self._counts = {"streams": 0, "errors": 0, "deltas": 0, "messages": 0}
+
+	def record(self, first_token, first_send, total, deltas, messages, error=False):
+		with self._lock:
+			self._counts["streams"] += 1
+			self._counts["errors"] += int(error)
+			self._counts["deltas"] += deltas
+			self._counts["messages"] += messages
+			for name, value in (("first_token", first_token), ("first_send", first_send), ("total", total)):
+				if value is not None:
+					self._samples[name].append(value)
+			due = self.log_every and self._counts["streams"] % self.log_every == 0
+		if due:
+			self.log()
+
+	def snapshot(self):
+		"""Return counters plus p50/p95/mean seconds for each latency."""
+		with self._lock:
+			report = dict(self._counts)
+			for name, values in self._samples.items():
+				report[f"{name}_p50"] = _percentile(values, 0.5)
+				report[f"{name}_p95"] = _percentile(values, 0.95)
+				report[f"{name}_mean"] = sum(values) / len(values) if values else None
+			return report
+
+	def log(self):
+		"""Log the current snapshot at INFO level and return it."""
+		report = self.snapshot()
+		logging.info(f"Streaming metrics: {report}")
+		return report
+
+
+streaming_metrics = StreamingMetrics()
+
+
+class TurnStreamer:
+	"""Relay an async iterator of text deltas to a Bot Framework turn while it is generated.
+
+	A typing indicator is shown until the first text goes out. In "chunks" mode
+	text is sent as separate messages, cut at sentence boundaries once min_chars
+	have built up or flush_interval has passed; in "update" mode the first message
+	is edited in place (for channels that support updates) at most once per
+	flush_interval. Latencies are recorded in metrics.
+	"""
+
+	def __init__(self, turn_context, mode=stream_mode, metrics=streaming_metrics, min_chars=stream_min_chars,
+				 flush_interval=stream_flush_interval, typing_interval=stream_typing_interval):
+		self.turn_context = turn_context
+		self.mode = mode
+		self.metrics = metrics
+		self.min_chars = min_chars
+		self.flush_interval = flush_interval
+		self.typing_interval = typing_interval
+		self.text = ""
+		self.sent = 0
+		self.first_token_latency = None
+		self._activity_id = None
+
+	async def stream(self, deltas):
+		"""Consume deltas, deliver them to the turn and return the full reply text."""
+		start = time.perf_counter()
+		first_send = None
+		pending = ""
+		count = 0
+		last_flush = start
+		typing = asyncio.ensure_future(self._show_typing())
+		error = False
+		try:
+			async for delta in deltas:
+				now = time.perf_counter()
+				if self.first_token_latency is None:
+					self.first_token_latency = now - start
+				count += 1
+				self.text += delta
+				pending += delta
+				cut = self._flush_point(pending, now - last_flush)
+				if cut:
+					await self._send(pending[:cut])
+					pending = pending[cut:]
+					last_flush = now
+					if first_send is None:
+						first_send = now - start
+						typing.cancel()
+			if pending.strip() or (pending and self.mode == "update"):
+				await self._send(pending)
+				if first_send is None:
+					first_send = time.perf_counter() - start
+			return self.text
+		except Exception:
+			error = True
+			raise
+		finally:
+			typing.cancel()
+			if self.metrics is not None:
+				self.metrics.record(self.first_token_latency, first_send, time.perf_counter() - start, count,
+									self.sent, error=error)
+
+	def _flush_point(self, pending, since_flush):
+		"""Return how many leading characters of pending to send now (0 to keep buffering)."""
+		if self.mode == "update":
+			return len(pending) if since_flush >= self.flush_interval else 0
+		if len(pending) < self.min_chars and since_flush < self.flush_interval:
+			return 0
+		boundaries = [match.end() for match in SENTENCE_BOUNDARY.finditer(pending)]
+		if boundaries:
+			return boundaries[-1]
+		# A long run without punctuation still goes out, cut at the last space
+		if len(pending) >= 4 * self.min_chars:
+			return pending.rfind(" ") + 1 or len(pending)
+		return 0
+
+	async def _send(self, chunk):
+		if self.mode == "update" and self._activity_id is not None:
+			activity = botbuilder_schema.Activity(id=self._activity_id, type=botbuilder_schema.ActivityTypes.message,
+												  text=self.text)
+			await self.turn_context.update_activity(activity)
+		else:
+			response = await self.turn_context.send_activity(botbuilder_core.MessageFactory.text(chunk))
+			self._activity_id = getattr(response, "id", None)
+		self.sent += 1
+
+	async def _show_typing(self):
+		try:
+			while True:
+				typing = botbuilder_schema.Activity(type=botbuilder_schema.ActivityTypes.typing)
+				await self.turn_context.send_activity(typing)
+				await asyncio.sleep(self.typing_interval)
+		except asyncio.CancelledError:
+			raise
+		except Exception as e:
+			logging.warning(f"Could not send typing indicator: {e}")
@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from module.lazy import lazy_import
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+googletrans = lazy_import("googletrans", "translation")
+
+translation_cache_path = os.getenv('PI_TRANSLATION_CACHE', os.path.join('.cache', 'translations.sqlite3'))
+translation_cache_max_entries = int(os.getenv('PI_TRANSLATION_CACHE_MAX_ENTRIES', '50000'))
+
+# Spaces and tabs between words; indentation at the start of a line is left alone
+INNER_SPACE_PATTERN = re.compile(r"(?<=\S)[ \t]+")
+# SQLite's default limit on host parameters per statement is 999
+SQL_VARIABLE_LIMIT = 900
+
+
+def normalize_text(text):
+	"""Return text in NFC form with inner runs of spaces collapsed and trailing whitespace dropped.
+
+	Line breaks and indentation are kept, so texts that share a normalized form
+	share a layout and can share a translation.
+	"""
+	lines = [INNER_SPACE_PATTERN.sub(" ", line).rstrip() for line in unicodedata.normalize("NFC", text).splitlines()]
+	return "\n".join(lines).strip("\n")
+
+
+def translation_key(text, dest_language):
+	"""Return the cache key for an already normalized text and a target language."""
+	return hashlib.sha1(f"{dest_language.lower()}\0{text}".encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+	"""Persistent translation cache in front of googletrans.
+
+	Translations are stored in a local SQLite file keyed by the normalized source
+	text and target language; the translator always sees the original text.
+	Every lookup refreshes an entry's last-used time and the least recently used
+	entries are evicted once max_entries is exceeded. translate_batch() sends all
+	cache misses to the translator in a single call.
+	"""
+
+	def __init__(self, path=translation_cache_path, max_entries=translation_cache_max_entries, translator=None):
+		self.path = path
+		self.max_entries = max_entries
+		self._translator = translator
+		self._lock = threading.Lock()
+		self._stats = {"hits": 0, "misses": 0, "evicted": 0, "translator_calls": 0}
+		if os.path.dirname(path):
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+		self._conn = sqlite3.connect(path, check_same_thread=False)
+		self._conn.execute("PRAGMA journal_mode=WAL")
+		self._conn.execute(
+			"CREATE TABLE IF NOT EXISTS translations ("
+			"key TEXT PRIMARY KEY, dest TEXT NOT NULL, source TEXT NOT NULL, "
+			"translation TEXT NOT NULL, last_used REAL NOT NULL)"
+		)
+		self._conn.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+		self._conn.commit()
+
+	@property
+	def translator(self):
+		if self._translator is None:
+			self._translator = googletrans.Translator()
+		return self._translator
+
+	def translate(self, text, dest_language):
+		"""Translate one string, answering from the cache when possible."""
+		return self.translate_batch([text], dest_language)[0]
+
+	def translate_batch(self, texts, dest_language):
+		"""Translate many strings into dest_language, returning results in input order.
+
+		Cached strings are answered locally; the distinct misses are translated in
+		one translator call and stored.
+		"""
+		keys = [translation_key(normalized, dest_language) if normalized else None
+				for normalized in map(normalize_text, texts)]
+		# First original text seen for each key is the one sent to the translator
+		sources = {}
+		for text, key in zip(texts, keys):
+			if key is not None:
+				sources.setdefault(key, text)
+		with self._lock:
+			found = self._lookup(list(sources))
+			misses = [key for key in sources if key not in found]
+			self._stats["hits"] += len(sources) - len(misses)
+			self._stats["misses"] += len(misses)
+		if misses:
+			translated = self._translate_remote([sources[key] for key in misses], dest_language)
+			rows = [(key, dest_language, sources[key], result) for key, result in zip(misses, translated)]
+			with self._lock:
+				self._store(rows)
+			found.update((row[0], row[3]) for row in rows)
+		return [found[key] if key is not None else text for text, key in zip(texts, keys)]
+
+	def stats(self):
+		with self._lock:
+			entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+		return {**self._stats, "entries": entries, "max_entries": self.max_entries}
+
+	def close(self):
+		with self._lock:
+			self._conn.close()
+
+	def _translate_remote(self, texts, dest_language):
+		self._stats["translator_calls"] += 1
+		results = self.translator.translate(texts, dest=dest_language)
+		return [result.text for result in results]
+
+	def _lookup(self, keys):
+		found = {}
+		now = time.time()
+		for start in range(0, len(keys), SQL_VARIABLE_LIMIT):
+			chunk = keys[start:start + SQL_VARIABLE_LIMIT]
+			placeholders = ",".join("?" * len(chunk))
+			found.update(self._conn.execute(
+				f"SELECT key, translation FROM translations WHERE key IN ({placeholders})", chunk
+			).fetchall())
+		if found:
+			self._conn.executemany("UPDATE translations SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+			self._conn.commit()
+		return found
+
+	def _store(self, rows):
+		now = time.time()
+		self._conn.executemany(
+			"INSERT OR REPLACE INTO translations (key, dest, source, translation, last_used) VALUES (?, ?, ?, ?, ?)",
+			[row + (now,) for row in rows]
+		)
+		excess = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0] - self.max_entries
+		if excess > 0:
+			self._conn.execute(
+				"DELETE FROM translations WHERE key IN (SELECT key FROM translations ORDER BY last_used LIMIT ?)",
+				(excess,)
+			)
+			self._stats["evicted"] += excess
+		self._conn.commit()
+
+
+_translation_memory = None
+_translation_memory_lock = threading.Lock()
+
+
+def get_translation_memory():
+	"""Return the shared TranslationMemory for this process."""
+	global _translation_memory
+	if _translation_memory is None:
+		with _translation_memory_lock:
+			if _translation_memory is None:
+				_translation_memory = TranslationMemory()
+	return _translation_memory
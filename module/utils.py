@@ -1,14 +1,29 @@
 import logging
 import os
-import random
 import sqlite3
 import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
 
 from termcolor import colored
 
+try:
+	from module.reasoning import DAVINCI_PERSPECTIVE, Perspective, ReasoningEngine
+except ImportError:  # imported as a top-level module from inside module/
+	from reasoning import DAVINCI_PERSPECTIVE, Perspective, ReasoningEngine
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Result limits applied to queries run for the bot; unset means no limit
+query_chunk_size = int(os.getenv('PI_QUERY_CHUNK_SIZE', '500'))
+query_max_rows = int(os.getenv('PI_QUERY_MAX_ROWS')) if os.getenv('PI_QUERY_MAX_ROWS') else None
+query_max_bytes = int(os.getenv('PI_QUERY_MAX_BYTES')) if os.getenv('PI_QUERY_MAX_BYTES') else None
+# Switching a database to WAL rewrites its header, so it is opt-in
+sqlite_wal_enabled = os.getenv('PI_SQLITE_WAL', 'false').lower() in ('1', 'true', 'yes')
+
 
 def connect_to_database(db_path):
 	"""Connect to the SQLite database specified by db_path."""
@@ -24,6 +39,135 @@ def connect_to_database(db_path):
 		return None
 
 
+class ConnectionPool:
+	"""Pool of read-only SQLite connections so concurrent callers never share one handle.
+
+	Connections are opened with a mode=ro URI, a larger statement cache and tuned
+	pragmas (mmap_size, cache_size, temp_store). With wal (PI_SQLITE_WAL) the
+	database is switched to WAL once on creation so readers do not block on
+	writers. Borrow a connection with "with pool.connection() as conn:"; callers
+	wait when max_size are checked out. The database file must already exist.
+	"""
+
+	def __init__(self, db_path, max_size=8, timeout=30.0, cached_statements=256, mmap_size=256 * 1024 * 1024,
+				 cache_size_kib=64 * 1024, wal=sqlite_wal_enabled):
+		if not os.path.isfile(db_path):
+			raise FileNotFoundError(f"Database file '{db_path}' not found")
+		self.db_path = db_path
+		self.max_size = max_size
+		self.timeout = timeout
+		self.cached_statements = cached_statements
+		self.mmap_size = mmap_size
+		self.cache_size_kib = cache_size_kib
+		self._idle = []
+		self._open = 0
+		self._condition = threading.Condition()
+		self._checkouts = 0
+		self._wait_seconds = 0.0
+		self._max_wait_seconds = 0.0
+		if wal:
+			self._enable_wal()
+
+	def _uri(self, mode):
+		# mode=ro/rw never creates the file, unlike a plain connect
+		return f"file:{quote(os.path.abspath(self.db_path))}?mode={mode}"
+
+	def _enable_wal(self):
+		try:
+			conn = sqlite3.connect(self._uri("rw"), uri=True)
+			try:
+				mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+			finally:
+				conn.close()
+			if mode.lower() != "wal":
+				logging.warning(colored(f"Database '{self.db_path}' stayed in {mode} journal mode.", "yellow"))
+		except sqlite3.OperationalError as e:
+			logging.warning(colored(f"Could not enable WAL for '{self.db_path}': {e}", "yellow"))
+
+	def _open_connection(self):
+		conn = sqlite3.connect(self._uri("ro"), uri=True, check_same_thread=False, timeout=self.timeout,
+							   cached_statements=self.cached_statements)
+		conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+		conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+		conn.execute("PRAGMA temp_store=MEMORY")
+		return conn
+
+	def acquire(self):
+		"""Check out a connection, opening a new one while under max_size."""
+		start = time.perf_counter()
+		with self._condition:
+			while not self._idle and self._open >= self.max_size:
+				remaining = self.timeout - (time.perf_counter() - start)
+				if remaining <= 0 or not self._condition.wait(remaining):
+					if not self._idle and self._open >= self.max_size:
+						raise TimeoutError(f"Timed out waiting for a connection to '{self.db_path}'")
+			if self._idle:
+				conn = self._idle.pop()
+			else:
+				self._open += 1
+				conn = None
+			waited = time.perf_counter() - start
+			self._checkouts += 1
+			self._wait_seconds += waited
+			self._max_wait_seconds = max(self._max_wait_seconds, waited)
+		if conn is None:
+			try:
+				conn = self._open_connection()
+			except sqlite3.Error:
+				with self._condition:
+					self._open -= 1
+					self._condition.notify()
+				raise
+		return conn
+
+	def release(self, conn):
+		"""Return a connection to the pool."""
+		with self._condition:
+			self._idle.append(conn)
+			self._condition.notify()
+
+	@contextmanager
+	def connection(self):
+		conn = self.acquire()
+		try:
+			yield conn
+		finally:
+			self.release(conn)
+
+	def close(self):
+		"""Close the idle connections; checked-out ones are returned to the pool as usual."""
+		with self._condition:
+			for conn in self._idle:
+				conn.close()
+			self._open -= len(self._idle)
+			self._idle = []
+
+	def stats(self):
+		with self._condition:
+			return {
+				"open_handles": self._open,
+				"idle_handles": len(self._idle),
+				"checkouts": self._checkouts,
+				"total_wait_seconds": self._wait_seconds,
+				"max_wait_seconds": self._max_wait_seconds,
+			}
+
+
+_connection_pools = {}
+_connection_pools_lock = threading.Lock()
+
+
+def get_connection_pool(db_path, **kwargs):
+	"""Return the shared read-only ConnectionPool for db_path, creating it on first use."""
+	key = os.path.abspath(db_path)
+	with _connection_pools_lock:
+		pool = _connection_pools.get(key)
+		if pool is None:
+			pool = ConnectionPool(db_path, **kwargs)
+			_connection_pools[key] = pool
+		return pool
+
+
 def get_table_names(conn):
 	"""Retrieve the names of all tables in the database."""
 	try:
@@ -50,31 +194,248 @@ def get_column_names(conn, table_name):
 		return []
 
 
-def get_database_info(conn):
-	"""Retrieve information about all tables and their columns in the database."""
+_schema_cache = {}
+_schema_cache_lock = threading.Lock()
+
+SCHEMA_COLUMNS_QUERY = """
+	SELECT m.name, p.name, p.type, p."notnull", p.dflt_value, p.pk
+	FROM sqlite_master AS m JOIN pragma_table_info(m.name) AS p
+	WHERE m.type = 'table'
+	ORDER BY m.name, p.cid
+"""
+SCHEMA_FOREIGN_KEYS_QUERY = """
+	SELECT m.name, f."from", f."table", f."to"
+	FROM sqlite_master AS m JOIN pragma_foreign_key_list(m.name) AS f
+	WHERE m.type = 'table'
+	ORDER BY m.name, f.id, f.seq
+"""
+SCHEMA_INDEXES_QUERY = """
+	SELECT m.name, i.name, i."unique", c.name
+	FROM sqlite_master AS m
+	JOIN pragma_index_list(m.name) AS i
+	JOIN pragma_index_info(i.name) AS c
+	WHERE m.type = 'table'
+	ORDER BY m.name, i.name, c.seqno
+"""
+
+
+def _load_schema(conn):
+	"""Read tables, columns, keys and indexes for the whole database in three set-based queries."""
+	tables = {}
+	for table_name, name, col_type, notnull, default, pk in conn.execute(SCHEMA_COLUMNS_QUERY):
+		table = tables.setdefault(table_name, {"columns": [], "primary_key": [], "foreign_keys": [], "indexes": {}})
+		table["columns"].append({"name": name, "type": col_type, "notnull": bool(notnull), "default": default})
+		if pk:
+			table["primary_key"].append((pk, name))
+	for table in tables.values():
+		table["primary_key"] = [name for _, name in sorted(table["primary_key"])]
+	for table_name, column, ref_table, ref_column in conn.execute(SCHEMA_FOREIGN_KEYS_QUERY):
+		tables[table_name]["foreign_keys"].append({"column": column, "table": ref_table, "to": ref_column})
+	for table_name, index_name, unique, column in conn.execute(SCHEMA_INDEXES_QUERY):
+		index = tables[table_name]["indexes"].setdefault(index_name, {"unique": bool(unique), "columns": []})
+		index["columns"].append(column)
+	return tables
+
+
+def get_schema(conn):
+	"""Return {table_name: {columns, primary_key, foreign_keys, indexes}} for the database.
+
+	The result is cached per database file and reused until the file's mtime or
+	PRAGMA schema_version changes, so repeated calls only cost one PRAGMA.
+	"""
 	try:
-		table_dicts = []
-		for table_name in get_table_names(conn):
-			columns_names = get_column_names(conn, table_name)
-			table_dicts.append({"table_name": table_name, "column_names": columns_names})
-		return table_dicts
+		db_file = conn.execute("PRAGMA database_list").fetchone()[2]
+		schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+		mtime = os.path.getmtime(db_file) if db_file else None
+		key = db_file or id(conn)
+		with _schema_cache_lock:
+			cached = _schema_cache.get(key)
+		if cached is not None and cached[0] == (mtime, schema_version):
+			return cached[1]
+		schema = _load_schema(conn)
+		with _schema_cache_lock:
+			_schema_cache[key] = ((mtime, schema_version), schema)
+		return schema
 	except sqlite3.OperationalError as e:
-		logging.error(colored(f"Error retrieving database info: {e}", "red"))
-		return []
+		logging.error(colored(f"Error retrieving database schema: {e}", "red"))
+		return {}
+
+
+def get_database_info(conn):
+	"""Retrieve information about all tables and their columns in the database."""
+	return [
+		{"table_name": table_name, "column_names": [column["name"] for column in table["columns"]]}
+		for table_name, table in get_schema(conn).items()
+	]
 
 
-def ask_database(conn, query):
-	"""Execute a query on the database and return the results."""
+def ask_database(conn, query, max_rows=query_max_rows, max_bytes=query_max_bytes):
+	"""Execute a query on the database and return the results.
+
+	With max_rows or max_bytes (PI_QUERY_MAX_ROWS / PI_QUERY_MAX_BYTES) the
+	results stop at that many rows or bytes and a warning is logged.
+	"""
 	try:
-		cursor = conn.cursor()
-		cursor.execute(query)
-		results = cursor.fetchall()
+		results = []
+		for chunk in iter_query(conn, query, max_rows=max_rows, max_bytes=max_bytes):
+			results.extend(chunk)
 		return results
 	except sqlite3.OperationalError as e:
 		logging.error(colored(f"Error executing query '{query}': {e}", "red"))
 		return []
 
 
+def _row_size(row):
+	"""Approximate the in-memory payload of a result row in bytes."""
+	return sum(len(value) if isinstance(value, (str, bytes)) else 8 for value in row)
+
+
+def iter_query(conn, query, params=(), chunk_size=query_chunk_size, max_rows=None, max_bytes=None):
+	"""Yield the rows of query in fetchmany chunks, stopping at max_rows rows or max_bytes bytes."""
+	cursor = conn.cursor()
+	try:
+		cursor.execute(query, params)
+		yield from _fetch_chunks(cursor, query, chunk_size, max_rows, max_bytes)
+	finally:
+		cursor.close()
+
+
+def _fetch_chunks(cursor, query, chunk_size, max_rows, max_bytes):
+	rows_seen = 0
+	bytes_seen = 0
+	while True:
+		size = chunk_size if max_rows is None else min(chunk_size, max_rows - rows_seen)
+		chunk = cursor.fetchmany(size) if size > 0 else []
+		if not chunk:
+			return
+		if max_bytes is not None:
+			for i, row in enumerate(chunk):
+				bytes_seen += _row_size(row)
+				if bytes_seen > max_bytes:
+					if i:
+						yield chunk[:i]
+					logging.warning(colored(f"Query result truncated at {max_bytes} bytes: '{query}'", "yellow"))
+					return
+		rows_seen += len(chunk)
+		yield chunk
+		if max_rows is not None and rows_seen >= max_rows:
+			if cursor.fetchone() is not None:
+				logging.warning(colored(f"Query result truncated at {max_rows} rows: '{query}'", "yellow"))
+			return
+
+
+def iter_query_columnar(conn, query, params=(), chunk_size=query_chunk_size, max_rows=None, max_bytes=None,
+						format="numpy"):
+	"""Yield query results as columnar batches.
+
+	With format="numpy" each batch is a dict of column name to numpy array; with
+	format="arrow" each batch is a pyarrow.RecordBatch. numpy/pyarrow are only
+	imported when this function is used.
+	"""
+	if format == "numpy":
+		import numpy as np
+	elif format == "arrow":
+		import pyarrow as pa
+	else:
+		raise ValueError(f"Unknown columnar format '{format}'")
+
+	cursor = conn.cursor()
+	try:
+		cursor.execute(query, params)
+		names = [column[0] for column in cursor.description]
+		for chunk in _fetch_chunks(cursor, query, chunk_size, max_rows, max_bytes):
+			columns = list(zip(*chunk))
+			if format == "numpy":
+				yield {name: np.array(values) for name, values in zip(names, columns)}
+			else:
+				yield pa.RecordBatch.from_arrays([pa.array(values) for values in columns], names=names)
+	finally:
+		cursor.close()
+
+
+def _strip_query(query):
+	return query.strip().rstrip(";")
+
+
+def paginate_query(conn, query, key_column, page_size=query_chunk_size, after=None, params=()):
+	"""Return one keyset-paginated page of query as (rows, next_cursor).
+
+	The query is wrapped as a subquery ordered by key_column, one of its result
+	columns, or by a tuple of columns compared as a row value; pass the returned
+	next_cursor as after to fetch the next page. next_cursor is None once the
+	last page has been returned.
+
+	The key must be unique across the result: the next page starts strictly after
+	the cursor, so rows sharing the boundary key would be skipped. When a page
+	ends inside such a run ValueError is raised; add a tie-breaking column (e.g.
+	("name", "id")) to make the key unique.
+	"""
+	columns = (key_column,) if isinstance(key_column, str) else tuple(key_column)
+	if not columns or not all(column.isidentifier() for column in columns):
+		raise ValueError(f"Invalid key column {key_column!r}")
+	key = ", ".join(f'"{column}"' for column in columns)
+	wrapped = f"SELECT * FROM ({_strip_query(query)}) AS page"
+	params = tuple(params)
+	if after is not None:
+		wrapped += f" WHERE ({key}) > ({', '.join('?' * len(columns))})"
+		params += (after,) if isinstance(key_column, str) else tuple(after)
+	wrapped += f" ORDER BY {key} LIMIT ?"
+	try:
+		cursor = conn.execute(wrapped, params + (page_size + 1,))
+		names = [column[0] for column in cursor.description]
+		key_indexes = [names.index(column) for column in columns]
+		rows = cursor.fetchall()
+	except (sqlite3.OperationalError, ValueError) as e:
+		logging.error(colored(f"Error paginating query '{query}': {e}", "red"))
+		return [], None
+	if len(rows) > page_size:
+		boundary = tuple(rows[page_size - 1][i] for i in key_indexes)
+		if boundary == tuple(rows[page_size][i] for i in key_indexes):
+			raise ValueError(f"Key {key_column!r} is not unique at {boundary!r}; add a tie-breaking column")
+		rows = rows[:page_size]
+		return rows, boundary[0] if isinstance(key_column, str) else boundary
+	return rows, None
+
+
+_vader_analyzer = None
+_vader_lock = threading.Lock()
+
+
+def get_vader_analyzer():
+	"""Return the shared VADER analyzer, loading its lexicon only once per process."""
+	global _vader_analyzer
+	if _vader_analyzer is None:
+		with _vader_lock:
+			if _vader_analyzer is None:
+				from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+				_vader_analyzer = SentimentIntensityAnalyzer()
+	return _vader_analyzer
+
+
+def analyze_sentiment_vader(text):
+	"""Analyze the sentiment of the given text using the shared VADER analyzer."""
+	return get_vader_analyzer().polarity_scores(text)
+
+
+def analyze_sentiment_vader_batch(texts):
+	"""Score many texts with VADER and return the results in columnar form.
+
+	Returns a dict of equal-length lists keyed by 'neg', 'neu', 'pos' and 'compound',
+	in the order of texts. Repeated texts are scored only once.
+	"""
+	analyzer = get_vader_analyzer()
+	columns = {"neg": [], "neu": [], "pos": [], "compound": []}
+	scored = {}
+	for text in texts:
+		scores = scored.get(text)
+		if scores is None:
+			scores = analyzer.polarity_scores(text)
+			scored[text] = scores
+		for key, values in columns.items():
+			values.append(scores[key])
+	return columns
+
+
 def remove_duplicates(file_path):
 	"""Remove duplicate lines from the specified file."""
 	with open(file_path, 'r') as file:
@@ -125,12 +486,7 @@ def acceleration_of_thought(complexity: int) -> float:
 
 def davinci_insights(question: str) -> str:
 	"""Generate insights like Da Vinci for the given question."""
-	perspectives = [
-		f"What if we view '{question}' from the perspective of the stars?",
-		f"Consider '{question}' as if it's a masterpiece of the universe.",
-		f"Reflect on '{question}' through the lens of nature's design."
-	]
-	return random.choice(perspectives)
+	return DAVINCI_PERSPECTIVE(question)
 
 
 def einstein_insights(question: str) -> str:
@@ -153,17 +509,20 @@ def adalovelace_insights(question: str) -> str:
 	return f"Ada Lovelace's innovative take on {question}"
 
 
+# Perspectives combined by universal_reasoning, in answer order
+reasoning_engine = ReasoningEngine([
+	Perspective("newton_thoughts", function=newton_thoughts, deterministic=True),
+	DAVINCI_PERSPECTIVE,
+	Perspective("einstein_insights", function=einstein_insights, deterministic=True),
+	Perspective("suntzu_insights", function=suntzu_insights, deterministic=True),
+	Perspective("gandhi_insights", function=gandhi_insights, deterministic=True),
+	Perspective("adalovelace_insights", function=adalovelace_insights, deterministic=True),
+])
+
+
 def universal_reasoning(question: str) -> str:
 	"""Generate a comprehensive response using various reasoning methods."""
-	responses = [
-		newton_thoughts(question),
-		davinci_insights(question),
-		einstein_insights(question),
-		suntzu_insights(question),
-		gandhi_insights(question),
-		adalovelace_insights(question)
-	]
-	return "\n".join(responses)
+	return reasoning_engine.reason(question)
 
 
 if __name__ == "__main__":
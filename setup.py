@@ -9,7 +9,7 @@ setup(
     packages=find_packages(),
     install_requires=[
         "openai==0.27.0",
-        "httpx==0.23.0",
+        "httpx[http2]==0.23.0",
         "requests==2.28.1",
         "google-auth==2.14.1",
         "google-api-python-client==2.64.0",
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules are imported as the module package from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -0,0 +1,52 @@
+import math
+
+import pytest
+
+from module.dataloading import LoaderConfig, has_transforms, make_loader, scaled_learning_rate
+
+
+def test_sqrt_scaling_grows_with_the_square_root_of_the_batch_ratio():
+	assert scaled_learning_rate(0.001, 256, base=32, rule="sqrt") == pytest.approx(0.001 * math.sqrt(8))
+	assert scaled_learning_rate(0.001, 8, base=32, rule="sqrt") == pytest.approx(0.0005)
+
+
+def test_linear_scaling_follows_the_batch_ratio():
+	assert scaled_learning_rate(0.1, 256, base=32, rule="linear") == pytest.approx(0.8)
+
+
+@pytest.mark.parametrize("rule", ["linear", "sqrt", "none"])
+def test_base_batch_size_keeps_the_learning_rate(rule):
+	assert scaled_learning_rate(0.001, 32, base=32, rule=rule) == pytest.approx(0.001)
+
+
+def test_no_scaling_ignores_the_batch_size():
+	assert scaled_learning_rate(0.001, 1024, base=32, rule="none") == 0.001
+
+
+def test_unknown_rule_is_rejected():
+	with pytest.raises(ValueError):
+		scaled_learning_rate(0.001, 256, base=32, rule="cubic")
+
+
+class _Dataset:
+	def __init__(self, transform=None):
+		self.transform = transform
+
+	def __len__(self):
+		return 8
+
+	def __getitem__(self, index):
+		import torch
+		return torch.full((2,), float(index)), index
+
+
+def test_transforms_are_detected():
+	assert not has_transforms(_Dataset())
+	assert has_transforms(_Dataset(transform=lambda sample: sample))
+
+
+def test_auto_preload_skips_datasets_with_transforms():
+	torch_data = pytest.importorskip("torch.utils.data")
+	config = LoaderConfig(batch_size=4, workers=0, preload="auto")
+	assert isinstance(make_loader(_Dataset(transform=lambda sample: sample), config), torch_data.DataLoader)
+	assert not isinstance(make_loader(_Dataset(), config), torch_data.DataLoader)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.model_selection import train_test_split
+
+from module.features import StreamingFeatureExtractor
+
+TEXTS = [
+	"the cat sat on the mat",
+	"dogs chase cats",
+	"the dog sat",
+	"a bird sang a song",
+	"cats and dogs and birds",
+	"the mat is red",
+	"songs about cats",
+	"red bird red song",
+]
+LABELS = ["pet", "pet", "pet", "bird", "pet", "home", "pet", "bird"]
+
+
+class SplitPreprocessor:
+	"""Stand-in for TextPreprocessor that tokenizes on whitespace, so no NLTK data is needed."""
+
+	def transform(self, texts):
+		return pd.DataFrame({"cleaned_text": texts, "lemmatized_tokens": [text.split() for text in texts]})
+
+
+@pytest.fixture
+def export(tmp_path):
+	path = tmp_path / "export.csv"
+	pd.DataFrame({"text_column": TEXTS, "label_column": LABELS}).to_csv(path, index=False)
+	return str(path)
+
+
+def extract(export, tmp_path, **options):
+	extractor = StreamingFeatureExtractor(chunk_rows=3, preprocessor=SplitPreprocessor(), **options)
+	return extractor.extract(export, str(tmp_path / "features"))
+
+
+def test_vocabulary_mode_matches_tfidf_vectorizer(export, tmp_path):
+	shards = extract(export, tmp_path, mode="vocabulary", max_features=1000)
+	X, labels = shards.load()
+	expected = TfidfVectorizer(analyzer=str.split).fit(TEXTS)
+	assert len(shards) == 3
+	assert shards.manifest["vocabulary"] == expected.get_feature_names_out().tolist()
+	np.testing.assert_allclose(X.toarray(), expected.transform(TEXTS).toarray(), atol=1e-6)
+	assert labels.tolist() == LABELS
+
+
+def test_hashing_mode_matches_hashed_tfidf(export, tmp_path):
+	shards = extract(export, tmp_path, mode="hashing", hash_bits=10)
+	X, _ = shards.load()
+	counts = HashingVectorizer(n_features=2 ** 10, analyzer=str.split, alternate_sign=False, norm=None).transform(TEXTS)
+	np.testing.assert_allclose(X.toarray(), TfidfTransformer().fit_transform(counts).toarray(), atol=1e-6)
+
+
+def test_split_gathers_the_same_rows_as_the_stacked_matrix(export, tmp_path):
+	shards = extract(export, tmp_path, mode="vocabulary", max_features=1000)
+	X, _ = shards.load()
+	y = np.array([0, 0, 0, 1, 0, 1, 0, 1])
+	X_train, X_test, y_train, y_test = shards.split(y, test_size=0.5, random_state=0)
+	train, test = train_test_split(np.arange(len(y)), test_size=0.5, random_state=0, stratify=y)
+	train, test = np.sort(train), np.sort(test)
+	np.testing.assert_array_equal(X_train.toarray(), X[train].toarray())
+	np.testing.assert_array_equal(X_test.toarray(), X[test].toarray())
+	assert y_train.tolist() == y[train].tolist() and y_test.tolist() == y[test].tolist()
+
+
+def test_take_returns_rows_in_the_order_asked_for(export, tmp_path):
+	shards = extract(export, tmp_path, mode="hashing", hash_bits=10)
+	X, _ = shards.load()
+	rows = [7, 0, 4, 3]
+	np.testing.assert_array_equal(shards.take(rows).toarray(), X[rows].toarray())
@@ -0,0 +1,80 @@
+import asyncio
+
+import httpx
+import pytest
+
+from module.gateway import FAILURE_MESSAGES, ExternalDataGateway
+
+WEATHER = {"main": {"temp": 288.1}, "weather": [{"description": "light rain"}]}
+
+
+def make_gateway(handler):
+	gateway = ExternalDataGateway(schedulers={})
+	gateway._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+	return gateway
+
+
+def test_concurrent_misses_share_one_request():
+	calls = []
+
+	async def handler(request):
+		calls.append(request.url.params["q"])
+		await asyncio.sleep(0.05)
+		return httpx.Response(200, json=WEATHER)
+
+	gateway = make_gateway(handler)
+
+	async def ask():
+		return await asyncio.gather(*(gateway.get_weather("London") for _ in range(5)))
+
+	answers = asyncio.run(ask())
+	assert len(set(answers)) == 1 and "light rain" in answers[0]
+	assert calls == ["London"]
+	stats = gateway.stats()
+	assert stats["upstream_calls"] == 1
+	assert stats["coalesced"] == 4
+
+
+def test_fresh_answers_come_from_the_cache():
+	calls = []
+
+	def handler(request):
+		calls.append(request.url.params["q"])
+		return httpx.Response(200, json=WEATHER)
+
+	gateway = make_gateway(handler)
+	first = gateway.get_weather_sync("London")
+	assert gateway.get_weather_sync(" london ") == first
+	assert len(calls) == 1
+	assert gateway.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("response", [
+	httpx.Response(503),
+	httpx.Response(200, json={"cod": 401, "message": "Invalid API key"}),
+])
+def test_failures_are_not_cached(response):
+	responses = [response, httpx.Response(200, json=WEATHER)]
+
+	def handler(request):
+		return responses.pop(0)
+
+	gateway = make_gateway(handler)
+	assert gateway.get_weather_sync("London") == FAILURE_MESSAGES["weather"]
+	assert "light rain" in gateway.get_weather_sync("London")
+	stats = gateway.stats()
+	assert stats["errors"] == 1
+	assert stats["upstream_calls"] == 2
+
+
+def test_last_known_answer_is_served_when_a_refresh_fails():
+	responses = [httpx.Response(200, json=WEATHER), httpx.Response(500)]
+
+	def handler(request):
+		return responses.pop(0)
+
+	gateway = make_gateway(handler)
+	first = gateway.get_weather_sync("London")
+	gateway.ttl["weather"] = gateway.stale_ttl["weather"] = 0
+	assert gateway.get_weather_sync("London") == first
+	assert gateway.stats()["errors"] == 1
@@ -0,0 +1,65 @@
+import pytest
+
+from module.semantic_cache import SemanticCache, question_terms
+
+SYSTEM_PROMPT = "You are Pi, a helpful assistant."
+
+
+@pytest.fixture
+def cache(tmp_path):
+	cache = SemanticCache(path=str(tmp_path / "cache.sqlite3"))
+	yield cache
+	cache.close()
+
+
+@pytest.mark.parametrize("stored, asked", [
+	("What is the capital of France?", "What's the capital of France?"),
+	("What is the capital of France?", "what is capital of france"),
+	("What is the capital of France?", "Capital of France?"),
+	("What is the capital of France?", "Tell me the capital of France"),
+	("How many moons does Jupiter have?", "how many moons has jupiter"),
+])
+def test_rephrased_question_hits(cache, stored, asked):
+	cache.store(stored, SYSTEM_PROMPT, "answer")
+	assert cache.lookup(asked, SYSTEM_PROMPT) == "answer"
+
+
+@pytest.mark.parametrize("stored, asked", [
+	("What is the GDP of Germany?", "What is the GDP of France?"),
+	("Can I take ibuprofen with alcohol?", "Can I take ibuprofen without alcohol?"),
+	("What was the population in 1990?", "What was the population in 2000?"),
+	("What is it?", "What is it?"),
+])
+def test_near_miss_question_misses(cache, stored, asked):
+	cache.store(stored, SYSTEM_PROMPT, "answer")
+	assert cache.lookup(asked, SYSTEM_PROMPT) is None
+
+
+def test_answers_are_kept_per_system_prompt(cache):
+	cache.store("What is the capital of France?", SYSTEM_PROMPT, "Paris")
+	assert cache.lookup("What is the capital of France?", "Answer in French.") is None
+	assert cache.invalidate(SYSTEM_PROMPT) == 1
+	assert cache.lookup("What is the capital of France?", SYSTEM_PROMPT) is None
+
+
+def test_expired_answers_miss(tmp_path):
+	cache = SemanticCache(path=str(tmp_path / "cache.sqlite3"), ttl=0)
+	cache.store("What is the capital of France?", SYSTEM_PROMPT, "Paris")
+	assert cache.lookup("What is the capital of France?", SYSTEM_PROMPT) is None
+	assert cache.stats()["expired"] == 1
+	cache.close()
+
+
+def test_answers_survive_a_restart(tmp_path):
+	path = str(tmp_path / "cache.sqlite3")
+	cache = SemanticCache(path=path)
+	cache.store("What is the capital of France?", SYSTEM_PROMPT, "Paris")
+	cache.close()
+	reopened = SemanticCache(path=path)
+	assert reopened.lookup("Capital of France?", SYSTEM_PROMPT) == "Paris"
+	reopened.close()
+
+
+def test_question_terms_keep_negations_and_numbers():
+	assert question_terms("Can I take ibuprofen without alcohol?") == {"take", "ibuprofen", "without", "alcohol"}
+	assert question_terms("Sales in 2023?") == {"sale", "2023"}
@@ -0,0 +1,108 @@
+import sqlite3
+import threading
+
+import pytest
+
+from module.utils import ConnectionPool, paginate_query
+
+
+@pytest.fixture
+def db_path(tmp_path):
+	path = str(tmp_path / "tracks.db")
+	conn = sqlite3.connect(path)
+	conn.execute("CREATE TABLE tracks (id INTEGER PRIMARY KEY, genre TEXT, name TEXT)")
+	conn.executemany("INSERT INTO tracks (id, genre, name) VALUES (?, ?, ?)",
+					 [(i, "abc"[i % 3], f"track {i:02d}") for i in range(1, 31)])
+	conn.commit()
+	conn.close()
+	return path
+
+
+def all_pages(conn, query, key_column, page_size):
+	rows, cursor, pages = [], None, 0
+	while True:
+		page, cursor = paginate_query(conn, query, key_column, page_size=page_size, after=cursor)
+		rows += page
+		pages += 1
+		if cursor is None:
+			return rows, pages
+
+
+def test_pages_cover_every_row_once(db_path):
+	conn = sqlite3.connect(db_path)
+	rows, pages = all_pages(conn, "SELECT id, name FROM tracks", "id", 7)
+	assert [row[0] for row in rows] == list(range(1, 31))
+	assert pages == 5
+
+
+def test_tuple_keys_page_through_duplicate_values(db_path):
+	conn = sqlite3.connect(db_path)
+	rows, _ = all_pages(conn, "SELECT genre, id FROM tracks", ("genre", "id"), 4)
+	assert rows == sorted(rows)
+	assert len(rows) == len(set(rows)) == 30
+
+
+def test_non_unique_key_at_a_page_boundary_is_refused(db_path):
+	conn = sqlite3.connect(db_path)
+	with pytest.raises(ValueError, match="not unique"):
+		paginate_query(conn, "SELECT genre, id FROM tracks", "genre", page_size=4)
+
+
+def test_query_parameters_and_trailing_semicolon(db_path):
+	conn = sqlite3.connect(db_path)
+	rows, cursor = paginate_query(conn, "SELECT id FROM tracks WHERE genre = ?;", "id", page_size=3, params=("a",))
+	assert rows == [(3,), (6,), (9,)]
+	assert cursor == 9
+
+
+def test_pool_requires_an_existing_file(tmp_path):
+	missing = tmp_path / "missing.db"
+	with pytest.raises(FileNotFoundError):
+		ConnectionPool(str(missing))
+	assert not missing.exists()
+
+
+def test_pooled_connections_are_read_only(db_path):
+	pool = ConnectionPool(db_path, wal=False)
+	with pool.connection() as conn:
+		assert conn.execute("SELECT COUNT(*) FROM tracks").fetchone() == (30,)
+		with pytest.raises(sqlite3.OperationalError):
+			conn.execute("DELETE FROM tracks")
+	pool.close()
+
+
+def test_pool_reuses_idle_connections(db_path):
+	pool = ConnectionPool(db_path, max_size=2, wal=False)
+	with pool.connection() as first:
+		pass
+	with pool.connection() as second:
+		assert second is first
+	assert pool.stats()["open_handles"] == 1
+	pool.close()
+
+
+def test_pool_times_out_when_every_connection_is_checked_out(db_path):
+	pool = ConnectionPool(db_path, max_size=1, timeout=0.05, wal=False)
+	with pool.connection():
+		with pytest.raises(TimeoutError):
+			pool.acquire()
+	pool.close()
+
+
+def test_waiting_caller_gets_the_released_connection(db_path):
+	pool = ConnectionPool(db_path, max_size=1, timeout=5, wal=False)
+	conn = pool.acquire()
+	borrowed = []
+	waiter = threading.Thread(target=lambda: borrowed.append(pool.acquire()))
+	waiter.start()
+	pool.release(conn)
+	waiter.join(5)
+	assert borrowed == [conn]
+	pool.close()
+
+
+def test_wal_is_opt_in(db_path):
+	ConnectionPool(db_path, wal=False).close()
+	assert sqlite3.connect(db_path).execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+	ConnectionPool(db_path, wal=True).close()
+	assert sqlite3.connect(db_path).execute("PRAGMA journal_mode").fetchone()[0] == "wal"